@@ -1,23 +1,128 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from fastapi.responses import Response
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
-from datetime import datetime, date
+from app.core.cache import cache
 from app.db.session import get_db
 from app.models import LeaveType, Holiday, LeaveDelegation, Employee, LeaveRequest, LeaveStatus
 from app.schemas.leave_management import (
     LeaveTypeCreate, LeaveTypeUpdate, LeaveType as LeaveTypeSchema,
     HolidayCreate, HolidayUpdate, Holiday as HolidaySchema,
     LeaveDelegationCreate, LeaveDelegationUpdate, LeaveDelegationWithDetails,
-    LeaveReportRequest, LeaveReportResponse
+    LeaveReportRequest, LeaveReportResponse, LeaveRequestWithDetails,
+    Employee as EmployeeSchema, LeaveStatusEnum, list_adapter
 )
-from app.services.leave_management import LeaveRequestService
-import logging
-
-logger = logging.getLogger(__name__)
+from app.services.leave_management import LEAVE_REQUEST_LIST_OPTIONS, as_date, year_range
 
 router = APIRouter(prefix="/leave", tags=["Leave Management - Admin"])
 
+# ORM rows are fetched in batches of this size when encoding list responses
+LIST_YIELD_PER = 500
+
+def _cached_json(db: Session, key: str, stmt, schema) -> Response:
+    """Serve the JSON list for `key` from cache, encoding the rows of `stmt` on a miss.
+
+    Rows are encoded a batch at a time as they are streamed from the database, so
+    only the current batch of ORM objects is alive alongside the output.
+    """
+    body = cache.get(key)
+    if body is None:
+        adapter = list_adapter(schema)
+        batches = db.scalars(stmt.execution_options(yield_per=LIST_YIELD_PER)).partitions()
+        # Each batch encodes as a JSON array; strip the brackets and splice the items together
+        body = b"[" + b",".join(
+            adapter.dump_json(adapter.validate_python(batch, from_attributes=True))[1:-1] for batch in batches
+        ) + b"]"
+        cache.set(key, body)
+    return Response(content=body, media_type="application/json")
+
+def _update_row(db: Session, model, row_id: int, changes: dict, schema):
+    """Apply `changes` to one row and return it as `schema`, or None if the row does not exist.
+
+    Uses a single UPDATE ... RETURNING where the dialect supports it. The row is
+    serialized before commit so the response does not trigger a reload.
+    """
+    if not changes:
+        row = db.get(model, row_id)
+    else:
+        stmt = update(model).where(model.id == row_id).values(**changes)
+        if db.get_bind().dialect.update_returning:
+            row = db.scalars(stmt.returning(model)).one_or_none()
+        else:
+            db.execute(stmt)
+            row = db.get(model, row_id)
+    
+    result = schema.model_validate(row) if row is not None else None
+    db.commit()
+    return result
+
+def _construct(schema, row, **overrides):
+    """Build `schema` from an ORM row without validation; the row is already trusted"""
+    values = {name: getattr(row, name) for name in schema.model_fields if name not in overrides}
+    return schema.model_construct(**values, **overrides)
+
+def _employee_row(employee: Employee) -> EmployeeSchema:
+    """Employee schema for a loaded row, skipping field validation"""
+    return _construct(EmployeeSchema, employee, hire_date=as_date(employee.hire_date))
+
+def _report_row(leave_request: LeaveRequest) -> LeaveRequestWithDetails:
+    """LeaveRequestWithDetails for a loaded report row, skipping field validation"""
+    return _construct(
+        LeaveRequestWithDetails,
+        leave_request,
+        start_date=as_date(leave_request.start_date),
+        end_date=as_date(leave_request.end_date),
+        status=LeaveStatusEnum(leave_request.status.value),
+        employee=_employee_row(leave_request.employee),
+        leave_type=_construct(LeaveTypeSchema, leave_request.leave_type),
+        approver=_employee_row(leave_request.approver) if leave_request.approver is not None else None
+    )
+
+def _build_leave_report(
+    db: Session, filters: list, join_employee: bool, limit: int, cursor: Optional[int]
+) -> Response:
+    """Fetch one page of report rows plus per-status counts for the whole filtered set.
+
+    Rows are keyset-paginated on id (newest first); pass the returned
+    `next_cursor` back as `cursor` to fetch the following page. The rows come
+    straight from the database, so the response is built with model_construct
+    and serialized directly instead of being validated again as the response model.
+    """
+    stmt = select(LeaveRequest).options(*LEAVE_REQUEST_LIST_OPTIONS)
+    counts_stmt = select(LeaveRequest.status, func.count(LeaveRequest.id))
+    
+    if join_employee:
+        stmt = stmt.join(Employee, LeaveRequest.employee_id == Employee.id)
+        counts_stmt = counts_stmt.join(Employee, LeaveRequest.employee_id == Employee.id)
+    
+    page_filters = list(filters)
+    if cursor is not None:
+        page_filters.append(LeaveRequest.id < cursor)
+    
+    # Fetch one extra row to know whether another page exists
+    leave_requests = db.scalars(
+        stmt.where(*page_filters).order_by(LeaveRequest.id.desc()).limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(leave_requests) > limit:
+        leave_requests = leave_requests[:limit]
+        next_cursor = leave_requests[-1].id
+    
+    # Count by status in SQL rather than scanning the rows in Python
+    counts = dict(db.execute(counts_stmt.where(*filters).group_by(LeaveRequest.status)).all())
+    
+    report = LeaveReportResponse.model_construct(
+        total_requests=sum(counts.values()),
+        approved_requests=counts.get(LeaveStatus.APPROVED, 0),
+        rejected_requests=counts.get(LeaveStatus.REJECTED, 0),
+        pending_requests=counts.get(LeaveStatus.PENDING, 0),
+        leave_requests=[_report_row(lr) for lr in leave_requests],
+        next_cursor=next_cursor
+    )
+    return Response(content=report.model_dump_json(), media_type="application/json")
+
 # Leave Type Management
 @router.post("/types", response_model=LeaveTypeSchema, status_code=status.HTTP_201_CREATED)
 def create_leave_type(
@@ -25,23 +130,18 @@ def create_leave_type(
     db: Session = Depends(get_db)
 ):
     """Create a new leave type"""
+    db_leave_type = LeaveType(**leave_type.model_dump())
+    db.add(db_leave_type)
     try:
-        # Check if leave type already exists
-        existing = db.query(LeaveType).filter(LeaveType.name == leave_type.name).first()
-        if existing:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Leave type with this name already exists")
-        
-        db_leave_type = LeaveType(**leave_type.dict())
-        db.add(db_leave_type)
         db.commit()
-        db.refresh(db_leave_type)
-        
-        return db_leave_type
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating leave type: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    except IntegrityError:
+        # leave_types.name is unique, so the insert itself is the duplicate check
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Leave type with this name already exists")
+    db.refresh(db_leave_type)
+    cache.delete_pattern("leave_types:*")
+    
+    return db_leave_type
 
 @router.get("/types", response_model=List[LeaveTypeSchema])
 def get_leave_types(
@@ -49,15 +149,11 @@ def get_leave_types(
     db: Session = Depends(get_db)
 ):
     """Get all leave types"""
-    try:
-        query = db.query(LeaveType)
-        if active_only:
-            query = query.filter(LeaveType.is_active == True)
-        
-        return query.all()
-    except Exception as e:
-        logger.error(f"Error fetching leave types: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    stmt = select(LeaveType)
+    if active_only:
+        stmt = stmt.where(LeaveType.is_active == True)
+    
+    return _cached_json(db, f"leave_types:active_only={active_only}", stmt, LeaveTypeSchema)
 
 @router.get("/types/{type_id}", response_model=LeaveTypeSchema)
 def get_leave_type(
@@ -65,17 +161,11 @@ def get_leave_type(
     db: Session = Depends(get_db)
 ):
     """Get a specific leave type"""
-    try:
-        leave_type = db.query(LeaveType).filter(LeaveType.id == type_id).first()
-        if not leave_type:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave type not found")
-        
-        return leave_type
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching leave type: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    leave_type = db.get(LeaveType, type_id)
+    if not leave_type:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave type not found")
+    
+    return leave_type
 
 @router.put("/types/{type_id}", response_model=LeaveTypeSchema)
 def update_leave_type(
@@ -84,69 +174,56 @@ def update_leave_type(
     db: Session = Depends(get_db)
 ):
   
-    try:
-        leave_type = db.query(LeaveType).filter(LeaveType.id == type_id).first()
-        if not leave_type:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave type not found")
-        
-        # Update fields
-        for field, value in leave_type_update.dict(exclude_unset=True).items():
-            setattr(leave_type, field, value)
-        
-        db.commit()
-        db.refresh(leave_type)
-        
-        return leave_type
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating leave type: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    leave_type = _update_row(db, LeaveType, type_id, leave_type_update.model_dump(exclude_unset=True), LeaveTypeSchema)
+    if leave_type is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave type not found")
+    cache.delete_pattern("leave_types:*")
+    
+    return leave_type
 
 # Holiday Management
+def normalize_active(
+    active_only: Optional[bool] = Query(None, description="Deprecated. Use is_active instead.", include_in_schema=False),
+    is_active: Optional[bool] = Query(None, description="Filter by active status: true for active, false for inactive, omit for all"),
+) -> Optional[bool]:
+    """Fold the deprecated active_only flag into is_active"""
+    if is_active is not None:
+        return is_active
+    return True if active_only else None
+
 @router.post("/holidays", response_model=HolidaySchema, status_code=status.HTTP_201_CREATED)
 def create_holiday(
     holiday: HolidayCreate,
     db: Session = Depends(get_db)
 ):
     """Create a new holiday"""
-    try:
-        db_holiday = Holiday(**holiday.dict())
-        db.add(db_holiday)
-        db.commit()
-        db.refresh(db_holiday)
-        
-        return db_holiday
-    except Exception as e:
-        logger.error(f"Error creating holiday: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    db_holiday = Holiday(**holiday.model_dump())
+    db.add(db_holiday)
+    db.commit()
+    db.refresh(db_holiday)
+    cache.delete_pattern("holidays:*")
+    
+    return db_holiday
 
 @router.get("/holidays", response_model=List[HolidaySchema])
 def get_holidays(
     year: Optional[int] = Query(None, description="Filter by year"),
-    active_only: Optional[bool] = Query(None, description="Deprecated. Use is_active instead.", include_in_schema=False),
-    is_active: Optional[bool] = Query(None, description="Filter by active status: true for active, false for inactive, omit for all"),
+    is_active: Optional[bool] = Depends(normalize_active),
     db: Session = Depends(get_db)
 ):
     
-    try:
-        query = db.query(Holiday)
-        
-        if is_active is not None:
-            query = query.filter(Holiday.is_active == is_active)
-        elif active_only:
-            query = query.filter(Holiday.is_active == True)
-        
-        if year:
-            # Cross-DB compatible year filter using date range
-            year_start = date(year, 1, 1)
-            year_end = date(year, 12, 31)
-            query = query.filter(and_(Holiday.date >= year_start, Holiday.date <= year_end))
-        
-        return query.order_by(Holiday.date).all()
-    except Exception as e:
-        logger.error(f"Error fetching holidays: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    stmt = select(Holiday)
+    
+    if is_active is not None:
+        stmt = stmt.where(Holiday.is_active == is_active)
+    
+    if year:
+        # Cross-DB compatible (and index-friendly) year filter using date range
+        year_start, year_end = year_range(year)
+        stmt = stmt.where(and_(Holiday.date >= year_start, Holiday.date <= year_end))
+    
+    key = f"holidays:year={year}:is_active={is_active}"
+    return _cached_json(db, key, stmt.order_by(Holiday.date), HolidaySchema)
 
 @router.put("/holidays/{holiday_id}", response_model=HolidaySchema)
 def update_holiday(
@@ -155,24 +232,12 @@ def update_holiday(
     db: Session = Depends(get_db)
 ):
     """Update a holiday"""
-    try:
-        holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
-        if not holiday:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Holiday not found")
-        
-        # Update fields
-        for field, value in holiday_update.dict(exclude_unset=True).items():
-            setattr(holiday, field, value)
-        
-        db.commit()
-        db.refresh(holiday)
-        
-        return holiday
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating holiday: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    holiday = _update_row(db, Holiday, holiday_id, holiday_update.model_dump(exclude_unset=True), HolidaySchema)
+    if holiday is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Holiday not found")
+    cache.delete_pattern("holidays:*")
+    
+    return holiday
 
 @router.delete("/holidays/{holiday_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_holiday(
@@ -180,18 +245,13 @@ def delete_holiday(
     db: Session = Depends(get_db)
 ):
     """Delete a holiday"""
-    try:
-        holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
-        if not holiday:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Holiday not found")
-        
-        db.delete(holiday)
-        db.commit()
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting holiday: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    holiday = db.get(Holiday, holiday_id)
+    if not holiday:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Holiday not found")
+    
+    db.delete(holiday)
+    db.commit()
+    cache.delete_pattern("holidays:*")
 
 # Leave Delegation Management
 @router.post("/delegations", response_model=LeaveDelegationWithDetails, status_code=status.HTTP_201_CREATED)
@@ -200,27 +260,23 @@ def create_leave_delegation(
     db: Session = Depends(get_db)
 ):
     """Create a new leave delegation"""
-    try:
-        # Validate that manager and delegate exist
-        manager = db.query(Employee).filter(Employee.id == delegation.manager_id).first()
-        delegate = db.query(Employee).filter(Employee.id == delegation.delegate_id).first()
-        
-        if not manager:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Manager not found")
-        if not delegate:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Delegate not found")
-        
-        db_delegation = LeaveDelegation(**delegation.dict())
-        db.add(db_delegation)
-        db.commit()
-        db.refresh(db_delegation)
-        
-        return db_delegation
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating leave delegation: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    # Validate that manager and delegate exist in a single query
+    found = set(db.scalars(
+        select(Employee.id).where(Employee.id.in_([delegation.manager_id, delegation.delegate_id]))
+    ).all())
+    
+    if delegation.manager_id not in found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Manager not found")
+    if delegation.delegate_id not in found:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Delegate not found")
+    
+    db_delegation = LeaveDelegation(**delegation.model_dump())
+    db.add(db_delegation)
+    db.commit()
+    db.refresh(db_delegation)
+    cache.delete_pattern("delegations:*")
+    
+    return db_delegation
 
 @router.get("/delegations", response_model=List[LeaveDelegationWithDetails])
 def get_leave_delegations(
@@ -229,19 +285,20 @@ def get_leave_delegations(
     db: Session = Depends(get_db)
 ):
     """Get all leave delegations"""
-    try:
-        query = db.query(LeaveDelegation)
-        
-        if manager_id:
-            query = query.filter(LeaveDelegation.manager_id == manager_id)
-        
-        if active_only:
-            query = query.filter(LeaveDelegation.is_active == True)
-        
-        return query.order_by(LeaveDelegation.start_date.desc()).all()
-    except Exception as e:
-        logger.error(f"Error fetching leave delegations: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    # Manager and delegate are serialized in full, so join them into the same query
+    stmt = select(LeaveDelegation).options(
+        joinedload(LeaveDelegation.manager),
+        joinedload(LeaveDelegation.delegate),
+    )
+    
+    if manager_id:
+        stmt = stmt.where(LeaveDelegation.manager_id == manager_id)
+    
+    if active_only:
+        stmt = stmt.where(LeaveDelegation.is_active == True)
+    
+    key = f"delegations:manager_id={manager_id}:active_only={active_only}"
+    return _cached_json(db, key, stmt.order_by(LeaveDelegation.start_date.desc()), LeaveDelegationWithDetails)
 
 @router.put("/delegations/{delegation_id}", response_model=LeaveDelegationWithDetails)
 def update_leave_delegation(
@@ -250,111 +307,63 @@ def update_leave_delegation(
     db: Session = Depends(get_db)
 ):
     """Update a leave delegation"""
-    try:
-        delegation = db.query(LeaveDelegation).filter(LeaveDelegation.id == delegation_id).first()
-        if not delegation:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave delegation not found")
-        
-        # Update fields
-        for field, value in delegation_update.dict(exclude_unset=True).items():
-            setattr(delegation, field, value)
-        
-        db.commit()
-        db.refresh(delegation)
-        
-        return delegation
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating leave delegation: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    delegation = _update_row(db, LeaveDelegation, delegation_id, delegation_update.model_dump(exclude_unset=True), LeaveDelegationWithDetails)
+    if delegation is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave delegation not found")
+    cache.delete_pattern("delegations:*")
+    
+    return delegation
 
 # Reports and Analytics
 @router.post("/reports", response_model=LeaveReportResponse)
 def generate_leave_report(
     report_request: LeaveReportRequest,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of requests to return"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Generate comprehensive leave reports"""
-    try:
-        service = LeaveRequestService(db)
-        
-        # Build query based on filters
-        query = db.query(LeaveRequest)
-        
-        if report_request.employee_id:
-            query = query.filter(LeaveRequest.employee_id == report_request.employee_id)
-        
-        if report_request.department:
-            query = query.join(Employee, LeaveRequest.employee_id == Employee.id).filter(Employee.department == report_request.department)
-        
-        if report_request.start_date:
-            query = query.filter(LeaveRequest.start_date >= report_request.start_date)
-        
-        if report_request.end_date:
-            query = query.filter(LeaveRequest.end_date <= report_request.end_date)
-        
-        if report_request.leave_type_id:
-            query = query.filter(LeaveRequest.leave_type_id == report_request.leave_type_id)
-        
-        if report_request.status:
-            query = query.filter(LeaveRequest.status == report_request.status)
-        
-        # Execute query
-        leave_requests = query.order_by(LeaveRequest.created_at.desc()).all()
-        
-        # Calculate statistics
-        total_requests = len(leave_requests)
-        approved_requests = len([r for r in leave_requests if r.status.value == "approved"])
-        rejected_requests = len([r for r in leave_requests if r.status.value == "rejected"])
-        pending_requests = len([r for r in leave_requests if r.status.value == "pending"])
-        
-        return LeaveReportResponse(
-            total_requests=total_requests,
-            approved_requests=approved_requests,
-            rejected_requests=rejected_requests,
-            pending_requests=pending_requests,
-            leave_requests=leave_requests
-        )
-    except Exception as e:
-        logger.error(f"Error generating leave report: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    # Build the filter list once; it is shared by the detail and aggregate queries
+    filters = []
+    
+    if report_request.employee_id:
+        filters.append(LeaveRequest.employee_id == report_request.employee_id)
+    
+    if report_request.department:
+        filters.append(Employee.department == report_request.department)
+    
+    if report_request.start_date:
+        filters.append(LeaveRequest.start_date >= report_request.start_date)
+    
+    if report_request.end_date:
+        filters.append(LeaveRequest.end_date <= report_request.end_date)
+    
+    if report_request.leave_type_id:
+        filters.append(LeaveRequest.leave_type_id == report_request.leave_type_id)
+    
+    if report_request.status:
+        filters.append(LeaveRequest.status == LeaveStatus(report_request.status.value))
+    
+    return _build_leave_report(db, filters, bool(report_request.department), limit, cursor)
 
 @router.get("/reports/department/{department}", response_model=LeaveReportResponse)
 def get_department_leave_report(
     department: str,
     year: Optional[int] = Query(None, description="Filter by year"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of requests to return"),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get leave report for a specific department"""
-    try:
-        query = db.query(LeaveRequest).join(Employee, LeaveRequest.employee_id == Employee.id).filter(Employee.department == department)
-        
-        if year:
-            year_start = date(year, 1, 1)
-            year_end = date(year, 12, 31)
-            query = query.filter(
-                and_(
-                    LeaveRequest.start_date >= year_start,
-                    LeaveRequest.start_date <= year_end
-                )
+    filters = [Employee.department == department]
+    
+    if year:
+        year_start, year_end = year_range(year)
+        filters.append(
+            and_(
+                LeaveRequest.start_date >= year_start,
+                LeaveRequest.start_date <= year_end
             )
-        
-        leave_requests = query.order_by(LeaveRequest.created_at.desc()).all()
-        
-        # Calculate statistics
-        total_requests = len(leave_requests)
-        approved_requests = len([r for r in leave_requests if r.status.value == "approved"])
-        rejected_requests = len([r for r in leave_requests if r.status.value == "rejected"])
-        pending_requests = len([r for r in leave_requests if r.status.value == "pending"])
-        
-        return LeaveReportResponse(
-            total_requests=total_requests,
-            approved_requests=approved_requests,
-            rejected_requests=rejected_requests,
-            pending_requests=pending_requests,
-            leave_requests=leave_requests
         )
-    except Exception as e:
-        logger.error(f"Error generating department leave report: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    
+    return _build_leave_report(db, filters, True, limit, cursor)
@@ -1,31 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import date
 from app.db.session import get_db
-from app.services.leave_management import LeaveRequestService, LeaveBalanceService, LeaveValidationService
+from app.services.leave_management import (
+    LeaveRequestService, LeaveBalanceService, LeaveValidationService, LEAVE_REQUEST_DETAIL_OPTIONS,
+    resolve_employee_id, get_employee_by_code, invalidate_policy_summary, as_date, leave_day_count
+)
 from app.schemas.leave_management import (
-    LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestWithDetails,
-    LeaveApprovalRequest, LeaveApprovalResponse, LeaveBalanceWithDetails,
-    EmployeeLeaveSummary, LeaveReportRequest, LeaveReportResponse
+    LeaveRequestCreate, LeaveRequestUpdate, LeaveRequestWithDetails, LeaveRequestListItem,
+    LeaveApprovalRequest, LeaveApprovalResponse, LeaveBulkApprovalRequest, LeaveBulkApprovalResponse, LeaveBalanceWithDetails,
+    EmployeeLeaveSummary, LeaveReportRequest, LeaveReportResponse, LeaveValidationResponse, MAX_LEAVE_REQUEST_DAYS
 )
 from app.models import Employee, LeaveRequest, LeaveStatus
 from app.schemas.leave_management import Employee as EmployeeSchema
-import logging
-
-logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/leave", tags=["Leave Management"])
 
+def _raise_not_pending(db: Session, request_id: int, detail: str):
+    """Explain why a pending-guarded UPDATE matched no row"""
+    if db.scalar(select(LeaveRequest.id).where(LeaveRequest.id == request_id)) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave request not found")
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+def _resolve_employee_ref(db: Session, employee_ref: str) -> int:
+    """Accept a numeric employee id or an employee code (e.g. EMP008)"""
+    if employee_ref.isdigit():
+        return int(employee_ref)
+    employee_id = resolve_employee_id(db, employee_ref)
+    if employee_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
+    return employee_id
+
+def _next_page(rows: list, limit: int, response: Response) -> list:
+    """Trim the extra look-ahead row and advertise the cursor for the following page"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    return rows
+
 # Employee Endpoints
 @router.get("/employees", response_model=List[EmployeeSchema])
 def get_employees(
+    response: Response,
     active_only: Optional[bool] = Query(
         None,
         description="Deprecated. Use is_active instead.",
         include_in_schema=False
     ),
     is_active: Optional[bool] = Query(None, description="Filter by active status: true for active, false for inactive, omit for all"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of items to return"),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor header from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get employees with optional active status filtering.
@@ -34,144 +60,118 @@ def get_employees(
     - is_active=false -> only inactive
     - is_active omitted -> all employees
     - active_only kept for backward compatibility (true behaves like is_active=true)
+
+    Results are paged by id; when more remain, the X-Next-Cursor header holds
+    the cursor for the next page.
     """
-    try:
-        query = db.query(Employee)
+    stmt = select(Employee)
 
-        if is_active is not None:
-            query = query.filter(Employee.is_active == is_active)
-        elif active_only:
-            query = query.filter(Employee.is_active == True)
+    if is_active is not None:
+        stmt = stmt.where(Employee.is_active == is_active)
+    elif active_only:
+        stmt = stmt.where(Employee.is_active == True)
 
-        return query.order_by(Employee.id.asc()).all()
-    except Exception as e:
-        logger.error(f"Error fetching employees: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    if cursor is not None:
+        stmt = stmt.where(Employee.id > cursor)
+
+    employees = db.scalars(stmt.order_by(Employee.id.asc()).limit(limit + 1)).all()
+    return _next_page(employees, limit, response)
 
 # Leave Request Endpoints
 @router.post("/requests", response_model=LeaveRequestWithDetails, status_code=status.HTTP_201_CREATED)
 def create_leave_request(
+    background_tasks: BackgroundTasks,
     employee_id: Optional[int] = Query(None, description="Deprecated. Use employee_code.", include_in_schema=False),
     employee_code: Optional[str] = Query(None, description="Alphanumeric employee code, e.g., EMP008"),
     leave_request: LeaveRequestCreate = None,
     db: Session = Depends(get_db)
 ):
     """Submit a new leave request. Accepts either employee_id (int) or employee_code (str)."""
-    try:
-        # Resolve employee by code if provided, otherwise use id
-        resolved_employee_id = employee_id
-        if employee_code is not None:
-            employee = db.query(Employee).filter(Employee.employee_id == employee_code).first()
-            if not employee:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found for provided code")
-            resolved_employee_id = employee.id
-        
+    # Resolve employee by code if provided, otherwise use id
+    resolved_employee_id = employee_id
+    if employee_code is not None:
+        resolved_employee_id = resolve_employee_id(db, employee_code)
         if resolved_employee_id is None:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either employee_id or employee_code")
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found for provided code")
+    
+    if resolved_employee_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either employee_id or employee_code")
 
-        service = LeaveRequestService(db)
-        success, message, db_request = service.create_leave_request(resolved_employee_id, leave_request)
-        
-        if not success:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
-        
-        # Return the request with related data
-        return db_request
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating leave request: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    service = LeaveRequestService(db, background_tasks)
+    success, message, db_request = service.create_leave_request(resolved_employee_id, leave_request)
+    
+    if not success:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+    
+    # Return the request with related data
+    return db_request
 
-@router.get("/requests/employee/{employee_id}", response_model=List[LeaveRequestWithDetails])
+@router.get("/requests/employee/{employee_id}", response_model=List[LeaveRequestListItem])
 def get_employee_leave_requests(
     employee_id: str,
+    response: Response,
     year: Optional[int] = Query(None, description="Filter by year"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of items to return"),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor header from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get all leave requests for an employee. Accepts numeric ID or employee code."""
-    try:
-        # Resolve numeric id or employee code
-        resolved_employee_id: Optional[int]
-        if employee_id.isdigit():
-            resolved_employee_id = int(employee_id)
-        else:
-            employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
-            if not employee:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
-            resolved_employee_id = employee.id
-
-        service = LeaveRequestService(db)
-        requests = service.get_employee_leave_requests(resolved_employee_id, year)
-        return requests
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching employee leave requests: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    service = LeaveRequestService(db)
+    requests = service.get_employee_leave_requests(_resolve_employee_ref(db, employee_id), year, limit, cursor)
+    return _next_page(requests, limit, response)
 
-@router.get("/requests/employee/by-code/{employee_code}", response_model=List[LeaveRequestWithDetails])
-def get_employee_leave_requests_by_code(
-    employee_code: str,
-    year: Optional[int] = Query(None, description="Filter by year"),
+@router.get("/requests/pending/{manager_id}", response_model=List[LeaveRequestListItem])
+def get_pending_requests_for_manager(
+    manager_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of items to return"),
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor header from the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get all leave requests for an employee by employee code."""
-    try:
-        employee = db.query(Employee).filter(Employee.employee_id == employee_code).first()
-        if not employee:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
-        service = LeaveRequestService(db)
-        requests = service.get_employee_leave_requests(employee.id, year)
-        return requests
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching employee leave requests by code: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    """Get pending leave requests for a manager to approve"""
+    service = LeaveRequestService(db)
+    requests = service.get_pending_requests_for_manager(manager_id, limit, cursor)
+    return _next_page(requests, limit, response)
 
-@router.get("/requests/pending/{manager_id}", response_model=List[LeaveRequestWithDetails])
-def get_pending_requests_for_manager(
-    manager_id: int,
+@router.put("/requests/approve/bulk", response_model=LeaveBulkApprovalResponse)
+def approve_leave_requests_bulk(
+    approver_id: int,
+    approval_data: LeaveBulkApprovalRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Get all pending leave requests for a manager to approve"""
-    try:
-        service = LeaveRequestService(db)
-        requests = service.get_pending_requests_for_manager(manager_id)
-        return requests
-    except Exception as e:
-        logger.error(f"Error fetching pending requests: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    """Approve or reject several pending leave requests at once; requests no longer pending are skipped"""
+    service = LeaveRequestService(db, background_tasks)
+    success, message, processed_ids = service.approve_many(approval_data.request_ids, approver_id, approval_data)
+    
+    if not success:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+    
+    return LeaveBulkApprovalResponse(success=True, message=message, processed_ids=processed_ids)
 
 @router.put("/requests/{request_id}/approve", response_model=LeaveApprovalResponse)
 def approve_leave_request(
     request_id: int,
     approver_id: int,
     approval_data: LeaveApprovalRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Approve or reject a leave request"""
-    try:
-        service = LeaveRequestService(db)
-        success, message = service.approve_leave_request(request_id, approver_id, approval_data)
-        
-        if not success:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
-        
-        # Get the updated request
-        updated_request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
-        
-        return LeaveApprovalResponse(
-            success=True,
-            message=message,
-            leave_request=updated_request
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error approving leave request: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    service = LeaveRequestService(db, background_tasks)
+    success, message = service.approve_leave_request(request_id, approver_id, approval_data)
+    
+    if not success:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+    
+    # Get the updated request
+    updated_request = db.get(LeaveRequest, request_id, options=LEAVE_REQUEST_DETAIL_OPTIONS)
+    
+    return LeaveApprovalResponse(
+        success=True,
+        message=message,
+        leave_request=updated_request
+    )
 
 @router.get("/requests/{request_id}", response_model=LeaveRequestWithDetails)
 def get_leave_request(
@@ -179,17 +179,11 @@ def get_leave_request(
     db: Session = Depends(get_db)
 ):
     """Get a specific leave request by ID"""
-    try:
-        request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
-        if not request:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave request not found")
-        
-        return request
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching leave request: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    request = db.get(LeaveRequest, request_id, options=LEAVE_REQUEST_DETAIL_OPTIONS)
+    if not request:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave request not found")
+    
+    return request
 
 @router.put("/requests/{request_id}", response_model=LeaveRequestWithDetails)
 def update_leave_request(
@@ -198,31 +192,50 @@ def update_leave_request(
     db: Session = Depends(get_db)
 ):
     """Update a leave request (only if pending)"""
-    try:
-        request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
+    changes = leave_request_update.model_dump(exclude_unset=True)
+    if not changes:
+        request = db.get(LeaveRequest, request_id)
         if not request:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave request not found")
-        
         if request.status != LeaveStatus.PENDING:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending requests can be updated")
-        
-        # Update fields
-        for field, value in leave_request_update.dict(exclude_unset=True).items():
-            setattr(request, field, value)
-        
-        # Recalculate total days if dates changed
-        if leave_request_update.start_date or leave_request_update.end_date:
-            request.total_days = (request.end_date - request.start_date).days + 1
-        
-        db.commit()
-        db.refresh(request)
-        
         return request
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating leave request: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    
+    if changes.get("status") is not None:
+        changes["status"] = LeaveStatus(changes["status"].value)
+    
+    # Recalculate total days if dates changed; only a one-sided change needs the stored dates
+    if "start_date" in changes or "end_date" in changes:
+        start_date, end_date = changes.get("start_date"), changes.get("end_date")
+        if start_date is None or end_date is None:
+            current = db.execute(
+                select(LeaveRequest.start_date, LeaveRequest.end_date).where(LeaveRequest.id == request_id)
+            ).one_or_none()
+            if current is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave request not found")
+            start_date = start_date or as_date(current.start_date)
+            end_date = end_date or as_date(current.end_date)
+        if end_date < start_date:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End date must be after start date")
+        total_days = leave_day_count(start_date, end_date)
+        if total_days > MAX_LEAVE_REQUEST_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Leave request cannot exceed {MAX_LEAVE_REQUEST_DAYS} days"
+            )
+        changes["total_days"] = total_days
+    
+    # The pending check is part of the UPDATE, so a concurrent approval cannot be overwritten
+    request = LeaveRequestService(db).update_if_pending(request_id, **changes)
+    if request is None:
+        db.rollback()
+        _raise_not_pending(db, request_id, "Only pending requests can be updated")
+    
+    # Serialize before commit so the response does not reload the row
+    result = LeaveRequestWithDetails.model_validate(request)
+    db.commit()
+    invalidate_policy_summary(result.employee_id)
+    
+    return result
 
 @router.delete("/requests/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_leave_request(
@@ -230,58 +243,28 @@ def cancel_leave_request(
     db: Session = Depends(get_db)
 ):
     """Cancel a leave request (only if pending)"""
-    try:
-        request = db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
-        if not request:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Leave request not found")
-        
-        if request.status != LeaveStatus.PENDING:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only pending requests can be cancelled")
-        
-        request.status = LeaveStatus.CANCELLED
-        db.commit()
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error cancelling leave request: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    service = LeaveRequestService(db)
+    request = service.update_if_pending(request_id, status=LeaveStatus.CANCELLED)
+    if request is None:
+        db.rollback()
+        _raise_not_pending(db, request_id, "Only pending requests can be cancelled")
+    
+    employee_id = request.employee_id
+    db.commit()
+    invalidate_policy_summary(employee_id)
+    
 
 # Leave Balance Endpoints
 @router.get("/balances/employee/{employee_id}", response_model=List[LeaveBalanceWithDetails])
 def get_employee_leave_balances(
-    employee_id: int,
-    year: Optional[int] = Query(None, description="Filter by year"),
-    db: Session = Depends(get_db)
-):
-    """Get leave balances for an employee"""
-    try:
-        service = LeaveBalanceService(db)
-        balances = service.get_employee_leave_balances(employee_id, year)
-        return balances
-    except Exception as e:
-        logger.error(f"Error fetching leave balances: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
-
-@router.get("/balances/employee/by-code/{employee_code}", response_model=List[LeaveBalanceWithDetails])
-def get_employee_leave_balances_by_code(
-    employee_code: str,
+    employee_id: str,
     year: Optional[int] = Query(None, description="Filter by year"),
     db: Session = Depends(get_db)
 ):
-    """Get leave balances for an employee by employee code."""
-    try:
-        employee = db.query(Employee).filter(Employee.employee_id == employee_code).first()
-        if not employee:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
-        service = LeaveBalanceService(db)
-        balances = service.get_employee_leave_balances(employee.id, year)
-        return balances
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching leave balances by code: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    """Get leave balances for an employee. Accepts numeric ID or employee code."""
+    service = LeaveBalanceService(db)
+    balances = service.get_employee_leave_balances(_resolve_employee_ref(db, employee_id), year)
+    return balances
 
 @router.post("/balances/initialize/{employee_id}", response_model=List[LeaveBalanceWithDetails])
 def initialize_employee_leave_balances(
@@ -290,16 +273,12 @@ def initialize_employee_leave_balances(
     db: Session = Depends(get_db)
 ):
     """Initialize leave balances for an employee for a specific year"""
-    try:
-        service = LeaveBalanceService(db)
-        balances = service.initialize_employee_leave_balances(employee_id, year)
-        return balances
-    except Exception as e:
-        logger.error(f"Error initializing leave balances: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    service = LeaveBalanceService(db)
+    balances = service.initialize_employee_leave_balances(employee_id, year)
+    return balances
 
 # Validation Endpoints
-@router.post("/validate")
+@router.post("/validate", response_model=LeaveValidationResponse)
 def validate_leave_request(
     employee_id: Optional[int] = Query(None, description="Deprecated. Use employee_code.", include_in_schema=False),
     employee_code: Optional[str] = Query(None, description="Alphanumeric employee code, e.g., EMP008"),
@@ -307,104 +286,50 @@ def validate_leave_request(
     db: Session = Depends(get_db)
 ):
     """Validate a leave request without creating it. Accepts either employee_id (int) or employee_code (str)."""
-    try:
-        resolved_employee_id = employee_id
-        if employee_code is not None:
-            employee = db.query(Employee).filter(Employee.employee_id == employee_code).first()
-            if not employee:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found for provided code")
-            resolved_employee_id = employee.id
-        
+    resolved_employee_id = employee_id
+    if employee_code is not None:
+        resolved_employee_id = resolve_employee_id(db, employee_code)
         if resolved_employee_id is None:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either employee_id or employee_code")
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found for provided code")
+    
+    if resolved_employee_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide either employee_id or employee_code")
 
-        service = LeaveValidationService(db)
-        is_valid, message = service.validate_leave_request(resolved_employee_id, leave_request)
-        
-        return {
-            "is_valid": is_valid,
-            "message": message,
-            "employee_id": resolved_employee_id,
-            "requested_dates": f"{leave_request.start_date} to {leave_request.end_date}"
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error validating leave request: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    service = LeaveValidationService(db)
+    is_valid, message = service.validate_leave_request(resolved_employee_id, leave_request)
+    
+    return {
+        "is_valid": is_valid,
+        "message": message,
+        "employee_id": resolved_employee_id,
+        "requested_dates": f"{leave_request.start_date} to {leave_request.end_date}"
+    }
 
 # Summary Endpoints
 @router.get("/summary/employee/{employee_id}", response_model=EmployeeLeaveSummary)
 def get_employee_leave_summary(
-    employee_id: int,
-    year: Optional[int] = Query(None, description="Filter by year"),
-    db: Session = Depends(get_db)
-):
-    """Get comprehensive leave summary for an employee"""
-    try:
-        if not year:
-            year = datetime.now().year
-        
-        # Get employee
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
-        
-        # Get leave balances
-        balance_service = LeaveBalanceService(db)
-        leave_balances = balance_service.get_employee_leave_balances(employee_id, year)
-        
-        # Get leave requests
-        request_service = LeaveRequestService(db)
-        all_requests = request_service.get_employee_leave_requests(employee_id, year)
-        
-        # Calculate statistics
-        total_requests = len(all_requests)
-        approved_requests = len([r for r in all_requests if r.status == LeaveStatus.APPROVED])
-        pending_requests = len([r for r in all_requests if r.status == LeaveStatus.PENDING])
-        
-        return EmployeeLeaveSummary(
-            employee=employee,
-            leave_balances=leave_balances,
-            total_requests_this_year=total_requests,
-            approved_requests_this_year=approved_requests,
-            pending_requests=pending_requests
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching employee leave summary: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
-
-@router.get("/summary/employee/by-code/{employee_code}", response_model=EmployeeLeaveSummary)
-def get_employee_leave_summary_by_code(
-    employee_code: str,
+    employee_id: str,
     year: Optional[int] = Query(None, description="Filter by year"),
     db: Session = Depends(get_db)
 ):
-    """Get comprehensive leave summary for an employee by employee code."""
-    try:
-        if not year:
-            year = datetime.now().year
-        employee = db.query(Employee).filter(Employee.employee_id == employee_code).first()
-        if not employee:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
-        balance_service = LeaveBalanceService(db)
-        leave_balances = balance_service.get_employee_leave_balances(employee.id, year)
-        request_service = LeaveRequestService(db)
-        all_requests = request_service.get_employee_leave_requests(employee.id, year)
-        total_requests = len(all_requests)
-        approved_requests = len([r for r in all_requests if r.status == LeaveStatus.APPROVED])
-        pending_requests = len([r for r in all_requests if r.status == LeaveStatus.PENDING])
-        return EmployeeLeaveSummary(
-            employee=employee,
-            leave_balances=leave_balances,
-            total_requests_this_year=total_requests,
-            approved_requests_this_year=approved_requests,
-            pending_requests=pending_requests
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error fetching employee leave summary by code: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    """Get comprehensive leave summary for an employee. Accepts numeric ID or employee code."""
+    if employee_id.isdigit():
+        employee = db.get(Employee, int(employee_id))
+    else:
+        employee = get_employee_by_code(db, employee_id)
+    if not employee:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
+    
+    year = year or date.today().year
+    leave_balances = LeaveBalanceService(db).get_employee_leave_balances(employee.id, year)
+    
+    # Count leave requests by status in SQL
+    status_counts = LeaveRequestService(db).get_status_counts(employee.id, year)
+    
+    return EmployeeLeaveSummary(
+        employee=employee,
+        leave_balances=leave_balances,
+        total_requests_this_year=sum(status_counts.values()),
+        approved_requests_this_year=status_counts.get(LeaveStatus.APPROVED, 0),
+        pending_requests=status_counts.get(LeaveStatus.PENDING, 0)
+    )
@@ -1,12 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Query
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List
 from app.db.session import get_db
 from app.services.business_rules import BusinessRuleValidationService, LeavePolicyService
-from app.schemas.leave_management import LeaveRequestCreate
-import logging
-
-logger = logging.getLogger(__name__)
+from app.services.leave_management import POLICY_SUMMARY_TTL
+from app.core.cache import cache
+from app.schemas.leave_management import MAX_BULK_VALIDATION_ITEMS, LeaveRequestCreate, LeaveValidationItem
 
 router = APIRouter(prefix="/leave", tags=["Leave Management - Validation & Policies"])
 
@@ -14,16 +13,25 @@ router = APIRouter(prefix="/leave", tags=["Leave Management - Validation & Polic
 def comprehensive_leave_validation(
     employee_id: int,
     leave_request: LeaveRequestCreate,
+    detail: bool = Query(True, description="Include the per-rule validation_details"),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """Perform comprehensive validation of a leave request"""
-    try:
-        validation_service = BusinessRuleValidationService(db)
-        result = validation_service.validate_leave_request_comprehensive(employee_id, leave_request)
-        return result
-    except Exception as e:
-        logger.error(f"Error in comprehensive validation: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+    validation_service = BusinessRuleValidationService(db)
+    result = validation_service.validate_leave_request_comprehensive(employee_id, leave_request, detail)
+    return result
+
+@router.post("/validate/comprehensive/bulk")
+def comprehensive_leave_validation_bulk(
+    items: List[LeaveValidationItem] = Body(..., max_length=MAX_BULK_VALIDATION_ITEMS),
+    detail: bool = Query(True, description="Include the per-rule validation_details"),
+    db: Session = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """Perform comprehensive validation of several leave requests, results in input order"""
+    validation_service = BusinessRuleValidationService(db)
+    return validation_service.validate_leave_request_comprehensive_bulk(
+        [(item.employee_id, item.leave_request) for item in items], detail
+    )
 
 @router.get("/policy/summary/{employee_id}")
 def get_leave_policy_summary(
@@ -31,10 +39,11 @@ def get_leave_policy_summary(
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """Get comprehensive leave policy summary for an employee"""
-    try:
+    key = f"policy:{employee_id}"
+    result = cache.get(key)
+    if result is None:
         policy_service = LeavePolicyService(db)
         result = policy_service.get_leave_policy_summary(employee_id)
-        return result
-    except Exception as e:
-        logger.error(f"Error getting leave policy summary: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+        if "error" not in result:
+            cache.set(key, result, ttl=POLICY_SUMMARY_TTL)
+    return result
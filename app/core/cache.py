@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry expiry.
+
+    Entries are local to the worker process, so invalidation on write only
+    reaches the worker that handled the write; other workers pick up the
+    change once their copy expires.
+    """
+
+    def __init__(self, ttl: int = 300, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store a value for `ttl` seconds (defaults to the cache TTL)"""
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._evict()
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+
+    def delete(self, key: str):
+        """Remove a single key"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_pattern(self, pattern: str):
+        """Remove every key starting with the pattern (a trailing `*` is optional)"""
+        prefix = pattern.rstrip("*")
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        # Drop expired entries first, then the one closest to expiry
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            del self._data[min(self._data, key=lambda k: self._data[k][0])]
+
+
+# Global instance
+cache = TTLCache(ttl=int(os.getenv("CACHE_TTL_SECONDS", "300")))
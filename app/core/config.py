@@ -1,10 +1,20 @@
 import os
-from functools import lru_cache
+import json
+from functools import cached_property, lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables from both .env and env.local files
 load_dotenv()
 
+@lru_cache
+def get_aws_secret(secret_name: str, region: str) -> dict:
+    """Fetch a JSON secret from AWS Secrets Manager once per process"""
+    import boto3
+
+    client = boto3.client('secretsmanager', region_name=region)
+    response = client.get_secret_value(SecretId=secret_name)
+    return json.loads(response['SecretString'])
+
 class Settings:
     ENV: str = os.getenv('ENV', 'development')
     MYSQL_USER: str = os.getenv('MYSQL_USER', 'root')
@@ -18,15 +28,45 @@ class Settings:
     
     # Timezone configuration
     TIMEZONE: str = os.getenv('TIMEZONE', 'Europe/Dublin')
+
+    # Database engine and connection pool (pool settings apply to server databases only).
+    # When DATABASE_URL is unset, production uses the pooled MySQL URI and other
+    # environments fall back to the local SQLite file.
+    DATABASE_URL: str = os.getenv('DATABASE_URL', '')
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '20'))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '40'))
+    DB_POOL_TIMEOUT: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    # Recycle well inside MySQL's wait_timeout so the server never drops a pooled connection first
+    DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_USE_LIFO: bool = os.getenv('DB_POOL_USE_LIFO', 'true').lower() == 'true'
+    DB_CONNECT_TIMEOUT: int = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+    # Set when an external pooler (e.g. PgBouncer in transaction mode) handles multiplexing
+    DB_USE_NULL_POOL: bool = os.getenv('DB_USE_NULL_POOL', 'false').lower() == 'true'
+    # Compiled-statement LRU; the optional report filters alone produce dozens of statement shapes
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv('DB_QUERY_CACHE_SIZE', '1200'))
+
+    # AWS Valkey (Redis-compatible) cache
+    AWS_VALKEY_ENDPOINT: str = os.getenv('AWS_VALKEY_ENDPOINT', '')
+    AWS_VALKEY_PORT: int = int(os.getenv('AWS_VALKEY_PORT', '6379'))
+    AWS_VALKEY_USERNAME: str = os.getenv('AWS_VALKEY_USERNAME', '')
+    AWS_VALKEY_PASSWORD: str = os.getenv('AWS_VALKEY_PASSWORD', '')
+    AWS_VALKEY_TLS: bool = os.getenv('AWS_VALKEY_TLS', 'false').lower() == 'true'
+    AWS_VALKEY_POOL_SIZE: int = int(os.getenv('AWS_VALKEY_POOL_SIZE', '32'))
+
+    # AWS DynamoDB
+    AWS_DYNAMODB_REGION: str = os.getenv('AWS_DYNAMODB_REGION', os.getenv('AWS_REGION', 'eu-west-1'))
+    AWS_DYNAMODB_ENDPOINT_URL: str = os.getenv('AWS_DYNAMODB_ENDPOINT_URL', '')
+    AWS_DYNAMODB_ACCESS_KEY_ID: str = os.getenv('AWS_DYNAMODB_ACCESS_KEY_ID', '')
+    AWS_DYNAMODB_SECRET_ACCESS_KEY: str = os.getenv('AWS_DYNAMODB_SECRET_ACCESS_KEY', '')
+    AWS_DYNAMODB_TABLE_PREFIX: str = os.getenv('AWS_DYNAMODB_TABLE_PREFIX', '')
+    AWS_DYNAMODB_HEALTHCHECK_ON_CONNECT: bool = os.getenv('AWS_DYNAMODB_HEALTHCHECK_ON_CONNECT', 'false').lower() == 'true'
     
 
-    @property
+    @cached_property
     def SQLALCHEMY_DATABASE_URI(self):
         if self.ENV == 'production':
             prod_db: str = os.getenv('MYSQL_DB', 'transcribe_dev')
             creds = get_aws_secret(self.AWS_SECRET_NAME, self.AWS_REGION)
-            print(creds,"================")
-            print(creds,"================")
             return f"mysql+pymysql://{creds['username']}:{creds['password']}@{creds['host']}:{creds['port']}/{prod_db}"
         else:
             return f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DB}"
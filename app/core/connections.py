@@ -1,24 +1,54 @@
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any
-from functools import wraps
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+from functools import lru_cache, wraps
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 import redis
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# BatchWriteItem accepts at most 25 put/delete requests per call
+DYNAMODB_BATCH_WRITE_LIMIT = 25
+DYNAMODB_BATCH_MAX_RETRIES = 8
+
+# Shared HTTP settings for DynamoDB: a connection pool large enough for the
+# request threadpool plus batch writers, keep-alive, and adaptive retries
+DYNAMODB_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+@lru_cache(maxsize=None)
+def get_boto3_session() -> boto3.session.Session:
+    """One boto3 session per process, so endpoint and credential resolution happen once"""
+    return boto3.session.Session()
+
 class LazyConnectionManager:
     """Base class for lazy connection managers"""
     
     def __init__(self):
         self._connection = None
         self._is_connected = False
+        self._lock = threading.Lock()
     
     def _ensure_connection(self):
         """Ensure connection is established before use"""
+        # Double-checked so concurrent first requests share a single handshake
         if not self._is_connected:
-            self._connect()
+            with self._lock:
+                if not self._is_connected:
+                    self._connect()
     
     def _connect(self):
         """Override in subclasses to implement connection logic"""
@@ -26,14 +56,15 @@ class LazyConnectionManager:
     
     def close(self):
         """Close the connection"""
-        if self._connection and self._is_connected:
-            try:
-                self._connection.close()
-                self._is_connected = False
-                self._connection = None
-                logger.info("Connection closed successfully")
-            except Exception as e:
-                logger.error(f"Error closing connection: {e}")
+        with self._lock:
+            if self._connection and self._is_connected:
+                try:
+                    self._connection.close()
+                    self._is_connected = False
+                    self._connection = None
+                    logger.info("Connection closed successfully")
+                except Exception as e:
+                    logger.error(f"Error closing connection: {e}")
 
 
 class ValkeyRedisManager(LazyConnectionManager):
@@ -52,10 +83,13 @@ class ValkeyRedisManager(LazyConnectionManager):
             connection_kwargs = {
                 'host': self.settings.AWS_VALKEY_ENDPOINT,
                 'port': self.settings.AWS_VALKEY_PORT,
-                'decode_responses': True,
+                # Replies stay raw bytes: get() decodes text, get_obj() parses JSON straight from bytes
+                'decode_responses': False,
                 'socket_connect_timeout': 5,
                 'socket_timeout': 5,
-                'retry_on_timeout': True,
+                # Broken sockets are dropped and the command retried on a fresh one
+                'retry': Retry(ExponentialBackoff(), 3),
+                'retry_on_error': [redis.ConnectionError, redis.TimeoutError],
                 'health_check_interval': 30
             }
             
@@ -66,10 +100,17 @@ class ValkeyRedisManager(LazyConnectionManager):
             
             # Add TLS if enabled
             if self.settings.AWS_VALKEY_TLS:
-                connection_kwargs['ssl'] = True
+                connection_kwargs['connection_class'] = redis.SSLConnection
                 connection_kwargs['ssl_cert_reqs'] = None
             
-            self._connection = redis.Redis(**connection_kwargs)
+            # Threads check out their own socket, waiting up to 5s when all are busy
+            pool = redis.BlockingConnectionPool(
+                max_connections=self.settings.AWS_VALKEY_POOL_SIZE,
+                timeout=5,
+                **connection_kwargs
+            )
+            # from_pool lets close() disconnect the pool along with the client
+            self._connection = redis.Redis.from_pool(pool)
             
             # Test connection
             self._connection.ping()
@@ -88,23 +129,25 @@ class ValkeyRedisManager(LazyConnectionManager):
     
     def execute_command(self, command: str, *args, **kwargs):
         """Execute a Redis command with automatic connection management"""
-        try:
-            conn = self.get_connection()
-            return conn.execute_command(command, *args, **kwargs)
-        except redis.ConnectionError:
-            logger.warning("Redis connection lost, attempting to reconnect...")
-            self._is_connected = False
-            self._connect()
-            conn = self.get_connection()
-            return conn.execute_command(command, *args, **kwargs)
+        return self.get_connection().execute_command(command, *args, **kwargs)
     
     def set(self, key: str, value: str, ex: Optional[int] = None):
         """Set a key-value pair in Redis"""
-        return self.execute_command('SET', key, value, ex=ex)
+        return self.get_connection().set(key, value, ex=ex)
     
     def get(self, key: str) -> Optional[str]:
         """Get a value by key from Redis"""
-        return self.execute_command('GET', key)
+        raw = self.execute_command('GET', key)
+        return raw.decode('utf-8') if raw is not None else None
+    
+    def set_obj(self, key: str, obj: Any, ex: Optional[int] = None):
+        """Store a JSON-serializable object"""
+        return self.get_connection().set(key, json.dumps(obj, separators=(',', ':')).encode(), ex=ex)
+    
+    def get_obj(self, key: str) -> Optional[Any]:
+        """Load an object stored with set_obj, or None if the key is missing"""
+        raw = self.execute_command('GET', key)
+        return json.loads(raw) if raw is not None else None
     
     def delete(self, key: str) -> int:
         """Delete a key from Redis"""
@@ -123,6 +166,9 @@ class DynamoDBManager(LazyConnectionManager):
         self.settings = get_settings()
         self._resource = None
         self._client = None
+        self._tables: Dict[str, Any] = {}
+        # Read once; settings do not change for the life of the process
+        self._table_prefix = self.settings.AWS_DYNAMODB_TABLE_PREFIX
     
     def _connect(self):
         """Establish connection to AWS DynamoDB"""
@@ -142,14 +188,17 @@ class DynamoDBManager(LazyConnectionManager):
                 aws_config['aws_access_key_id'] = self.settings.AWS_DYNAMODB_ACCESS_KEY_ID
                 aws_config['aws_secret_access_key'] = self.settings.AWS_DYNAMODB_SECRET_ACCESS_KEY
             
-            # Create DynamoDB resource and client
-            self._resource = boto3.resource('dynamodb', **aws_config)
-            self._client = boto3.client('dynamodb', **aws_config)
+            # The client is the resource's own, so both share one connection pool
+            self._resource = get_boto3_session().resource('dynamodb', config=DYNAMODB_CLIENT_CONFIG, **aws_config)
+            self._client = self._resource.meta.client
+            self._tables = {}
             
-            # Test connection by listing tables
-            self._client.list_tables(Limit=1)
+            # Credentials are validated by the first real call; the probe is opt-in for diagnostics
+            if self.settings.AWS_DYNAMODB_HEALTHCHECK_ON_CONNECT:
+                self._client.list_tables(Limit=1)
             self._is_connected = True
-            self._connection = self._resource
+            # close() goes through the client, which owns the shared HTTP pool
+            self._connection = self._client
             logger.info("Successfully connected to AWS DynamoDB")
             
         except (NoCredentialsError, ClientError) as e:
@@ -173,12 +222,17 @@ class DynamoDBManager(LazyConnectionManager):
     
     def get_table(self, table_name: str):
         """Get a DynamoDB table by name"""
-        full_table_name = f"{self.settings.AWS_DYNAMODB_TABLE_PREFIX}{table_name}"
-        return self.get_resource().Table(full_table_name)
+        # Table wrappers are cached per connection; the set of table names is small and fixed
+        resource = self.get_resource()
+        table = self._tables.get(table_name)
+        if table is None:
+            full_table_name = f"{self._table_prefix}{table_name}"
+            table = self._tables[table_name] = resource.Table(full_table_name)
+        return table
     
     def create_table(self, table_name: str, key_schema: list, attribute_definitions: list, **kwargs):
         """Create a new DynamoDB table"""
-        full_table_name = f"{self.settings.AWS_DYNAMODB_TABLE_PREFIX}{table_name}"
+        full_table_name = f"{self._table_prefix}{table_name}"
         return self.get_resource().create_table(
             TableName=full_table_name,
             KeySchema=key_schema,
@@ -191,6 +245,33 @@ class DynamoDBManager(LazyConnectionManager):
         table = self.get_table(table_name)
         return table.put_item(Item=item)
     
+    def batch_put_items(self, table_name: str, items: List[Dict[str, Any]], max_workers: int = 4) -> int:
+        """Put many items using BatchWriteItem, 25 per request, retrying unprocessed items"""
+        full_table_name = f"{self._table_prefix}{table_name}"
+        chunks = [items[i:i + DYNAMODB_BATCH_WRITE_LIMIT] for i in range(0, len(items), DYNAMODB_BATCH_WRITE_LIMIT)]
+        if len(chunks) <= 1 or max_workers <= 1:
+            for chunk in chunks:
+                self._write_batch(full_table_name, chunk)
+        else:
+            # boto3 clients are thread-safe, so independent batches can be in flight together
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                list(executor.map(lambda chunk: self._write_batch(full_table_name, chunk), chunks))
+        return len(items)
+    
+    def _write_batch(self, full_table_name: str, chunk: List[Dict[str, Any]]):
+        # The resource-level call takes plain Python values, matching put_item
+        request_items = {full_table_name: [{"PutRequest": {"Item": item}} for item in chunk]}
+        attempt = 0
+        while request_items:
+            response = self.get_resource().batch_write_item(RequestItems=request_items)
+            request_items = response.get("UnprocessedItems") or {}
+            if request_items:
+                if attempt >= DYNAMODB_BATCH_MAX_RETRIES:
+                    raise RuntimeError(f"DynamoDB batch write to {full_table_name} left items unprocessed after {attempt} retries")
+                # Exponential backoff with jitter while the table is throttling
+                time.sleep(min(2 ** attempt * 0.05 + random.random() * 0.1, 2.0))
+                attempt += 1
+    
     def get_item(self, table_name: str, key: Dict[str, Any]):
         """Get an item from a DynamoDB table"""
         table = self.get_table(table_name)
@@ -222,30 +303,38 @@ valkey_manager = ValkeyRedisManager()
 dynamodb_manager = DynamoDBManager()
 
 
-def with_redis_connection(func):
-    """Decorator to ensure Redis connection is available for function execution"""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            valkey_manager._ensure_connection()
-            return func(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"Redis operation failed: {e}")
-            raise
-    return wrapper
+def _with_connection(manager: LazyConnectionManager, name: str):
+    """Build a decorator that ensures `manager` is connected before the wrapped function runs"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                manager._ensure_connection()
+                return func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"{name} operation failed: {e}")
+                raise
+        return wrapper
+    return decorator
 
 
-def with_dynamodb_connection(func):
-    """Decorator to ensure DynamoDB connection is available for function execution"""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            dynamodb_manager._ensure_connection()
-            return func(*args, **kwargs)
-        except Exception as e:
-            logger.error(f"DynamoDB operation failed: {e}")
-            raise
-    return wrapper
+with_redis_connection = _with_connection(valkey_manager, "Redis")
+with_dynamodb_connection = _with_connection(dynamodb_manager, "DynamoDB")
+
+
+async def open_configured_connections():
+    """Connect the configured managers in parallel so the first request skips the handshakes"""
+    managers = [("DynamoDB", dynamodb_manager)]
+    if valkey_manager.settings.AWS_VALKEY_ENDPOINT:
+        managers.append(("Redis", valkey_manager))
+    results = await asyncio.gather(
+        *(asyncio.to_thread(manager._ensure_connection) for _, manager in managers),
+        return_exceptions=True
+    )
+    # A failed warm-up is not fatal: the manager retries lazily on first use
+    for (name, _), result in zip(managers, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Could not pre-open {name} connection: {result}")
 
 
 def close_all_connections():
@@ -5,17 +5,20 @@ from fastapi.exception_handlers import request_validation_exception_handler
 from sqlalchemy.exc import IntegrityError
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 def add_global_exception_handlers(app: FastAPI):
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
-        print(f"DEBUG: Validation Error on {request.method} {request.url}")
-        print(f"DEBUG: Validation Error Details: {exc.errors()}")
-        try:
-            body = await request.body()
-            print(f"DEBUG: Request Body: {body.decode('utf-8')}")
-        except Exception as e:
-            print(f"DEBUG: Could not read request body: {e}")
+        logger.warning("Validation error on %s %s: %s", request.method, request.url.path, exc.errors())
+        # Request bodies can carry personal data, so they are only read and logged at debug level
+        if logger.isEnabledFor(logging.DEBUG):
+            try:
+                body = await request.body()
+                logger.debug("Request body: %s", body.decode("utf-8"))
+            except Exception as e:
+                logger.debug("Could not read request body: %s", e)
         return await request_validation_exception_handler(request, exc)
 
     @app.exception_handler(IntegrityError)
@@ -29,8 +32,9 @@ def add_global_exception_handlers(app: FastAPI):
 
     @app.exception_handler(Exception)
     async def generic_exception_handler(request: Request, exc: Exception):
-        logging.error(f"Unhandled Exception: {exc}")
+        # Endpoints let unexpected errors propagate; this is the single place they are logged
+        logger.exception("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
         return JSONResponse(
             status_code=500,
-            content={"detail": "An unexpected error occurred."}
+            content={"detail": "Internal server error"}
         )
@@ -1,22 +1,55 @@
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import logging
 
-from sqlalchemy import create_engine
-from app.core.config import get_settings
-
-from app.models import Base
+from sqlalchemy import inspect, text
+from app.db.session import engine
+from app.models import Base, LeaveBalance
 # Add other Base imports if you have more models
 
-settings = get_settings()
-DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
+logger = logging.getLogger(__name__)
+
+LEAVE_BALANCE_KEY = ("employee_id", "year", "leave_type_id")
+LEAVE_BALANCE_KEY_NAME = "uq_lb_emp_year_type"
+
+def has_leave_balance_key(bind) -> bool:
+    """Whether leave_balances has a unique constraint or index on (employee_id, year, leave_type_id)"""
+    inspector = inspect(bind)
+    key = set(LEAVE_BALANCE_KEY)
+    return any(
+        set(constraint["column_names"]) == key
+        for constraint in inspector.get_unique_constraints(LeaveBalance.__tablename__)
+    ) or any(
+        index["unique"] and set(index["column_names"]) == key
+        for index in inspector.get_indexes(LeaveBalance.__tablename__)
+    )
+
+def ensure_leave_balance_key(bind):
+    """Add the balance unique key to a table created before it existed, dropping duplicate rows first.
+
+    Readers have always taken the first matching row, so the lowest id of each
+    duplicate group is kept.
+    """
+    with bind.begin() as connection:
+        if has_leave_balance_key(connection):
+            return
+        # The derived table lets MySQL delete from the table it selects from
+        deleted = connection.execute(text(
+            "DELETE FROM leave_balances WHERE id NOT IN ("
+            "SELECT id FROM (SELECT MIN(id) AS id FROM leave_balances"
+            " GROUP BY employee_id, year, leave_type_id) AS keep)"
+        )).rowcount
+        if deleted:
+            logger.warning(f"Removed {deleted} duplicate leave balance row(s) before adding {LEAVE_BALANCE_KEY_NAME}")
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX {LEAVE_BALANCE_KEY_NAME} ON leave_balances ({', '.join(LEAVE_BALANCE_KEY)})"
+        ))
 
 def init_db():
-    engine = create_engine(DATABASE_URL)
-    
+    # Uses the application's engine, so tables land in the database the API connects to
     Base.metadata.create_all(bind=engine)
+    # create_all leaves existing tables alone, so constraints added later are applied here
+    ensure_leave_balance_key(engine)
     # Repeat for other Base.metadata if needed
 
 if __name__ == "__main__":
     init_db()
-    print("Database tables created.") 
+    print("Database tables created.")
@@ -1,21 +1,17 @@
-
-import sys
-import os
+"""Create the tables and load sample data. Run from the project root with
+`python -m app.db.init_leave_data`."""
 from datetime import datetime, date, timedelta
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-# Add the project root directory to the Python path
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-sys.path.insert(0, project_root)
-
-from app.db.session import SessionLocal, engine
-from app.models import Base, Employee, LeaveType, LeaveBalance, Holiday, LeaveDelegation
-from app.services.leave_management import LeaveBalanceService
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.models import Employee, LeaveType, LeaveBalance, Holiday, LeaveDelegation
 
 def create_tables():
     """Create all database tables"""
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    init_db()
     print("Database tables created successfully!")
 
 def create_sample_employees(db: Session):
@@ -135,19 +131,21 @@ def create_sample_employees(db: Session):
         ("EMP015", "Daniel", "Lewis", "daniel.lewis@company.com", "Sales", "Sales Representative", sales_manager.id, date(2021, 10, 1)),
     ]
     
-    for emp_id, first_name, last_name, email, dept, pos, mgr_id, hire_date in employees_data:
-        employee = Employee(
-            employee_id=emp_id,
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            department=dept,
-            position=pos,
-            manager_id=mgr_id,
-            hire_date=hire_date,
-            is_active=True
-        )
-        db.add(employee)
+    # Leaf employees reference only the managers above, so they go in one batched INSERT
+    db.execute(insert(Employee), [
+        {
+            "employee_id": emp_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "department": dept,
+            "position": pos,
+            "manager_id": mgr_id,
+            "hire_date": hire_date,
+            "is_active": True
+        }
+        for emp_id, first_name, last_name, email, dept, pos, mgr_id, hire_date in employees_data
+    ])
     
     db.commit()
     print(f"Created {len(employees_data) + 7} sample employees")
@@ -166,19 +164,20 @@ def create_sample_leave_types(db: Session):
         ("Compensatory Leave", "Leave earned through overtime work", None, 5, True, False, True, 2),
     ]
     
-    for name, desc, max_yearly, max_consecutive, requires_approval, requires_medical, carry_forward, max_carry_forward in leave_types_data:
-        leave_type = LeaveType(
-            name=name,
-            description=desc,
-            max_days_per_year=max_yearly,
-            max_consecutive_days=max_consecutive,
-            requires_approval=requires_approval,
-            requires_medical_certificate=requires_medical,
-            carry_forward_enabled=carry_forward,
-            max_carry_forward_days=max_carry_forward,
-            is_active=True
-        )
-        db.add(leave_type)
+    db.execute(insert(LeaveType), [
+        {
+            "name": name,
+            "description": desc,
+            "max_days_per_year": max_yearly,
+            "max_consecutive_days": max_consecutive,
+            "requires_approval": requires_approval,
+            "requires_medical_certificate": requires_medical,
+            "carry_forward_enabled": carry_forward,
+            "max_carry_forward_days": max_carry_forward,
+            "is_active": True
+        }
+        for name, desc, max_yearly, max_consecutive, requires_approval, requires_medical, carry_forward, max_carry_forward in leave_types_data
+    ])
     
     db.commit()
     print(f"Created {len(leave_types_data)} leave types")
@@ -202,15 +201,16 @@ def create_sample_holidays(db: Session):
         ("Christmas Day", date(current_year, 12, 25), True, "Christmas celebration"),
     ]
     
-    for name, holiday_date, is_recurring, description in holidays_data:
-        holiday = Holiday(
-            name=name,
-            date=holiday_date,
-            is_recurring=is_recurring,
-            description=description,
-            is_active=True
-        )
-        db.add(holiday)
+    db.execute(insert(Holiday), [
+        {
+            "name": name,
+            "date": holiday_date,
+            "is_recurring": is_recurring,
+            "description": description,
+            "is_active": True
+        }
+        for name, holiday_date, is_recurring, description in holidays_data
+    ])
     
     db.commit()
     print(f"Created {len(holidays_data)} holidays")
@@ -219,16 +219,15 @@ def initialize_leave_balances(db: Session):
     """Initialize leave balances for all employees"""
     print("Initializing leave balances for all employees...")
     
+    # Imported here so creating tables does not load the service layer
+    from app.services.leave_management import LeaveBalanceService
+    
     balance_service = LeaveBalanceService(db)
     current_year = datetime.now().year
     
-    # Get all employees
-    employees = db.query(Employee).filter(Employee.is_active == True).all()
-    
-    for employee in employees:
-        balance_service.initialize_employee_leave_balances(employee.id, current_year)
+    created = balance_service.bulk_initialize(current_year)
     
-    print(f"Initialized leave balances for {len(employees)} employees")
+    print(f"Initialized {created} leave balances for all active employees")
 
 def create_sample_delegations(db: Session):
     """Create sample leave delegations"""
@@ -246,16 +245,17 @@ def create_sample_delegations(db: Session):
         (sales_manager.id, hr_manager.id, date(2024, 8, 1), date(2024, 8, 7), "Sales Manager vacation delegation"),
     ]
     
-    for manager_id, delegate_id, start_date, end_date, reason in delegations_data:
-        delegation = LeaveDelegation(
-            manager_id=manager_id,
-            delegate_id=delegate_id,
-            start_date=start_date,
-            end_date=end_date,
-            reason=reason,
-            is_active=True
-        )
-        db.add(delegation)
+    db.execute(insert(LeaveDelegation), [
+        {
+            "manager_id": manager_id,
+            "delegate_id": delegate_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "reason": reason,
+            "is_active": True
+        }
+        for manager_id, delegate_id, start_date, end_date, reason in delegations_data
+    ])
     
     db.commit()
     print(f"Created {len(delegations_data)} leave delegations")
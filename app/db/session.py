@@ -1,15 +1,56 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.pool import NullPool
+from app.core.config import get_settings
 
-# Use SQLite for easier setup
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./leave_management.db")
+settings = get_settings()
+
+# SQLite serializes writers, so it is only the default outside production
+DATABASE_URL = settings.DATABASE_URL or (
+    settings.SQLALCHEMY_DATABASE_URI if settings.ENV == 'production' else 'sqlite:///./leave_management.db'
+)
 
 # Create engine with SQLite-specific settings
 if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the writer and turns commits into log appends;
+        # NORMAL sync is durable across application crashes, only a power loss can drop the last commits
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+elif settings.DB_USE_NULL_POOL:
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=NullPool,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT},
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    )
 else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # LIFO keeps a small set of connections warm and lets idle extras time out
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+        connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT},
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -18,4 +59,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -1,6 +1,9 @@
 import os
+import json
 import time
 import platform
+import threading
+from contextlib import asynccontextmanager
 
 # Set Dublin timezone globally
 os.environ['TZ'] = 'Europe/Dublin'
@@ -8,22 +11,36 @@ os.environ['TZ'] = 'Europe/Dublin'
 if platform.system() != 'Windows':
     time.tzset()  # Apply timezone change immediately
 
-from fastapi import FastAPI, status
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import api_router
 from app.core.middleware import add_global_exception_handlers
+from app.core.connections import open_configured_connections, close_all_connections
+from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_configured_connections()
+    # Encode the OpenAPI schema before serving so the first docs request does not pay for it
+    openapi_json_bytes()
+    yield
+    close_all_connections()
+
 app = FastAPI(
     title="Leave Management API",
     version="1.0.0",
     description="API for Employee Leave Management System",
-    docs_url="/app/v1/api/docs",
+    # The schema and docs routes are registered below so the schema can be served pre-encoded
+    docs_url=None,
     redoc_url=None,
-    openapi_url="/app/v1/api/openapi.json",
+    openapi_url=None,
+    lifespan=lifespan,
 )
 
+OPENAPI_URL = "/app/v1/api/openapi.json"
+
 @app.get("/api/health-check", include_in_schema=False)
 def health_check():
     return JSONResponse(
@@ -46,16 +63,38 @@ app.add_middleware(
 
 
 
+_openapi_lock = threading.Lock()
+_openapi_json: bytes = b""
+
 def custom_openapi():
+    # Double-checked so concurrent first requests build the schema only once
     if app.openapi_schema:
         return app.openapi_schema
-    openapi_schema = get_openapi(
-        title="Leave Management API",
-        version="1.0.0",
-        description="API for Employee Leave Management System",
-        routes=app.routes,
-    )
-    app.openapi_schema = openapi_schema
+    with _openapi_lock:
+        if not app.openapi_schema:
+            app.openapi_schema = get_openapi(
+                title="Leave Management API",
+                version="1.0.0",
+                description="API for Employee Leave Management System",
+                routes=app.routes,
+            )
     return app.openapi_schema
 
+def openapi_json_bytes() -> bytes:
+    """The OpenAPI schema encoded once, so docs requests skip re-serialization"""
+    global _openapi_json
+    if not _openapi_json:
+        encoded = json.dumps(custom_openapi(), separators=(",", ":")).encode()
+        with _openapi_lock:
+            _openapi_json = _openapi_json or encoded
+    return _openapi_json
+
 app.openapi = custom_openapi
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+def openapi_json():
+    return Response(content=openapi_json_bytes(), media_type="application/json")
+
+@app.get("/app/v1/api/docs", include_in_schema=False)
+def swagger_ui():
+    return get_swagger_ui_html(openapi_url=OPENAPI_URL, title=f"{app.title} - Swagger UI")
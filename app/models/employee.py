@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
+from sqlalchemy.orm import backref, column_property, relationship
 from sqlalchemy.sql import func
 from app.models import Base
 
@@ -18,12 +18,22 @@ class Employee(Base):
     hire_date = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    # Built in the SELECT rather than stored, so existing databases need no new column;
+    # rendered as || or CONCAT() per dialect
+    full_name = column_property(first_name + " " + last_name)
     
-    # Relationships
-    manager = relationship("Employee", remote_side=[id], backref="subordinates")
-    leave_requests = relationship("LeaveRequest", foreign_keys="LeaveRequest.employee_id", back_populates="employee")
-    leave_balances = relationship("LeaveBalance", back_populates="employee")
-    approvals = relationship("LeaveRequest", foreign_keys="LeaveRequest.approved_by", back_populates="approver")
+    # Relationships. The one-to-many collections are unbounded, so they never lazy load:
+    # query them explicitly or use selectinload()
+    manager = relationship("Employee", remote_side=[id], backref=backref("subordinates", lazy="raise"))
+    leave_requests = relationship("LeaveRequest", foreign_keys="LeaveRequest.employee_id", back_populates="employee", lazy="raise")
+    leave_balances = relationship("LeaveBalance", back_populates="employee", lazy="raise")
+    approvals = relationship("LeaveRequest", foreign_keys="LeaveRequest.approved_by", back_populates="approver", lazy="raise")
+    
+    # Department reports join on department; pending-approval lookups filter on manager_id
+    __table_args__ = (
+        Index("ix_emp_dept", "department"),
+        Index("ix_emp_manager", "manager_id"),
+    )
     
     def __repr__(self):
-        return f"<Employee(id={self.id}, employee_id='{self.employee_id}', name='{self.first_name} {self.last_name}')>"
+        return f"<Employee(id={self.id}, employee_id='{self.employee_id}', name='{self.full_name}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models import Base
@@ -15,5 +15,15 @@ class Holiday(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
+    # get_holidays filters by date range and sorts by date, almost always for
+    # active holidays only; the partial index skips inactive rows where supported
+    __table_args__ = (
+        Index(
+            "ix_hol_active_date", "date",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
+    
     def __repr__(self):
         return f"<Holiday(id={self.id}, name='{self.name}', date='{self.date}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models import Base
@@ -21,5 +21,11 @@ class LeaveBalance(Base):
     employee = relationship("Employee", back_populates="leave_balances")
     leave_type = relationship("LeaveType", back_populates="leave_balances")
     
+    # One balance per employee, leave type and year. Leading with (employee_id, year)
+    # lets the same unique index serve the per-employee, per-year balance reads.
+    __table_args__ = (
+        UniqueConstraint("employee_id", "year", "leave_type_id", name="uq_lb_emp_year_type"),
+    )
+    
     def __repr__(self):
         return f"<LeaveBalance(id={self.id}, employee_id={self.employee_id}, year={self.year}, remaining={self.remaining_balance})>"
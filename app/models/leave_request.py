@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models import Base
@@ -20,7 +20,8 @@ class LeaveRequest(Base):
     end_date = Column(DateTime, nullable=False)
     total_days = Column(Integer, nullable=False)
     reason = Column(Text, nullable=True)
-    status = Column(Enum(LeaveStatus), default=LeaveStatus.PENDING)
+    # Stored as VARCHAR so adding a status needs no ALTER of a database ENUM type
+    status = Column(Enum(LeaveStatus, native_enum=False, length=16), default=LeaveStatus.PENDING)
     approved_by = Column(Integer, ForeignKey("employees.id"), nullable=True)
     approved_at = Column(DateTime, nullable=True)
     rejection_reason = Column(Text, nullable=True)
@@ -33,5 +34,14 @@ class LeaveRequest(Base):
     leave_type = relationship("LeaveType", back_populates="leave_requests")
     approver = relationship("Employee", foreign_keys=[approved_by], back_populates="approvals")
     
+    # Indexes for the report and overlap-check predicates
+    __table_args__ = (
+        Index("ix_lr_emp_start", "employee_id", "start_date"),
+        Index("ix_lr_status_start", "status", "start_date"),
+        Index("ix_lr_emp_status_dates", "employee_id", "status", "start_date", "end_date"),
+        Index("ix_lr_type", "leave_type_id"),
+        Index("ix_lr_dates", "start_date", "end_date"),
+    )
+    
     def __repr__(self):
         return f"<LeaveRequest(id={self.id}, employee_id={self.employee_id}, status='{self.status.value}')>"
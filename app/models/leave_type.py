@@ -20,8 +20,8 @@ class LeaveType(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
-    leave_requests = relationship("LeaveRequest", back_populates="leave_type")
-    leave_balances = relationship("LeaveBalance", back_populates="leave_type")
+    leave_requests = relationship("LeaveRequest", back_populates="leave_type", lazy="raise")
+    leave_balances = relationship("LeaveBalance", back_populates="leave_type", lazy="raise")
     
     def __repr__(self):
         return f"<LeaveType(id={self.id}, name='{self.name}')>"
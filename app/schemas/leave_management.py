@@ -1,8 +1,16 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, validator
 from typing import Optional, List
+from functools import lru_cache
 from datetime import datetime, date
 from enum import Enum
 
+# Largest batch one bulk approval call may decide; bounds the IN list and the emails queued
+MAX_BULK_APPROVAL_IDS = 100
+# Largest batch one bulk validation call may check; its queries grow with every item
+MAX_BULK_VALIDATION_ITEMS = 100
+# Longest leave a request may cover; bounds the holiday lookups and day counts per request
+MAX_LEAVE_REQUEST_DAYS = 366
+
 class LeaveStatusEnum(str, Enum):
     PENDING = "pending"
     APPROVED = "approved"
@@ -38,8 +46,7 @@ class Employee(EmployeeBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Leave Type Schemas
 class LeaveTypeBase(BaseModel):
@@ -72,8 +79,7 @@ class LeaveType(LeaveTypeBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Leave Request Schemas
 class LeaveRequestBase(BaseModel):
@@ -90,7 +96,11 @@ class LeaveRequestBase(BaseModel):
         return v
 
 class LeaveRequestCreate(LeaveRequestBase):
-    pass
+    @validator('end_date')
+    def validate_request_length(cls, v, values):
+        if 'start_date' in values and (v - values['start_date']).days + 1 > MAX_LEAVE_REQUEST_DAYS:
+            raise ValueError(f'Leave request cannot exceed {MAX_LEAVE_REQUEST_DAYS} days')
+        return v
 
 class LeaveRequestUpdate(BaseModel):
     start_date: Optional[date] = None
@@ -111,14 +121,28 @@ class LeaveRequest(LeaveRequestBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class LeaveRequestWithDetails(LeaveRequest):
     employee: Employee
     leave_type: LeaveType
     approver: Optional[Employee] = None
 
+class LeaveRequestListItem(BaseModel):
+    """Lean row for list views; use LeaveRequestWithDetails for a single request"""
+    id: int
+    employee_id: int
+    employee_name: str
+    leave_type_id: int
+    leave_type_name: str
+    start_date: date
+    end_date: date
+    total_days: int
+    status: LeaveStatusEnum
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
 # Leave Balance Schemas
 class LeaveBalanceBase(BaseModel):
     leave_type_id: int
@@ -143,8 +167,7 @@ class LeaveBalance(LeaveBalanceBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class LeaveBalanceWithDetails(LeaveBalance):
     employee: Employee
@@ -173,8 +196,7 @@ class Holiday(HolidayBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Leave Delegation Schemas
 class LeaveDelegationBase(BaseModel):
@@ -205,8 +227,7 @@ class LeaveDelegation(LeaveDelegationBase):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class LeaveDelegationWithDetails(LeaveDelegation):
     manager: Employee
@@ -222,6 +243,24 @@ class LeaveApprovalResponse(BaseModel):
     message: str
     leave_request: Optional[LeaveRequestWithDetails] = None
 
+class LeaveBulkApprovalRequest(LeaveApprovalRequest):
+    request_ids: List[int] = Field(min_length=1, max_length=MAX_BULK_APPROVAL_IDS)
+
+class LeaveBulkApprovalResponse(BaseModel):
+    success: bool
+    message: str
+    processed_ids: List[int]
+
+class LeaveValidationResponse(BaseModel):
+    is_valid: bool
+    message: str
+    employee_id: int
+    requested_dates: str
+
+class LeaveValidationItem(BaseModel):
+    employee_id: int
+    leave_request: LeaveRequestCreate
+
 # Report Schemas
 class LeaveReportRequest(BaseModel):
     employee_id: Optional[int] = None
@@ -237,6 +276,7 @@ class LeaveReportResponse(BaseModel):
     rejected_requests: int
     pending_requests: int
     leave_requests: List[LeaveRequestWithDetails]
+    next_cursor: Optional[int] = None
 
 class EmployeeLeaveSummary(BaseModel):
     employee: Employee
@@ -244,3 +284,8 @@ class EmployeeLeaveSummary(BaseModel):
     total_requests_this_year: int
     approved_requests_this_year: int
     pending_requests: int
+
+@lru_cache(maxsize=64)
+def list_adapter(schema) -> TypeAdapter:
+    """TypeAdapter for List[schema], built once per schema since building one compiles a core schema"""
+    return TypeAdapter(List[schema])
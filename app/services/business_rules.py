@@ -1,101 +1,194 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, and_, or_, func, select, tuple_
 from typing import List, Optional, Tuple, Dict, Any
-from datetime import datetime, date, timedelta
-from app.models import Employee, LeaveType, LeaveRequest, LeaveBalance, Holiday, LeaveDelegation, LeaveStatus
+from datetime import date, timedelta
+from app.models import Employee, LeaveType, LeaveRequest, LeaveBalance, LeaveDelegation, LeaveStatus
 from app.schemas.leave_management import LeaveRequestCreate
+from app.services.leave_management import (
+    as_date, count_business_days, get_holidays_in_range, invalidate_policy_summary, leave_day_count,
+    upsert_leave_balances, year_range
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Leave types whose requests should say why they are being taken
+_REASON_REQUIRED_TYPES = frozenset({"sick leave", "emergency leave"})
+# Statuses that still hold the requested days
+_ACTIVE_STATUSES = (LeaveStatus.PENDING, LeaveStatus.APPROVED)
+
+# Policy thresholds used by the validators and reported in the policy summary
+PROBATION_DAYS = 90
+PROBATION_PERIOD = timedelta(days=PROBATION_DAYS)
+FUTURE_REQUEST_WARNING = timedelta(days=365)
+LONG_REQUEST_DAYS = 30
+LOW_BALANCE_MARGIN_DAYS = 5
+MIN_ADVANCE_NOTICE_DAYS = 7
+PEAK_MONTHS = frozenset({12})
+
 class BusinessRuleValidationService:
     """Service for comprehensive business rule validation"""
     
     def __init__(self, db: Session):
         self.db = db
     
-    def validate_leave_request_comprehensive(self, employee_id: int, leave_request: LeaveRequestCreate) -> Dict[str, Any]:
-        """Comprehensive validation of leave request with detailed results"""
+    def validate_leave_request_comprehensive(self, employee_id: int, leave_request: LeaveRequestCreate, detail: bool = True) -> Dict[str, Any]:
+        """Comprehensive validation of leave request; `detail=False` leaves out the per-rule results"""
+        today = date.today()
+        # Employee, leave type and this year's balance come back in one statement;
+        # the validators below only inspect what was fetched here
+        row = self.db.execute(
+            select(Employee, LeaveType, LeaveBalance)
+            .select_from(Employee)
+            .outerjoin(LeaveType, LeaveType.id == leave_request.leave_type_id)
+            .outerjoin(LeaveBalance, and_(
+                LeaveBalance.employee_id == Employee.id,
+                LeaveBalance.leave_type_id == LeaveType.id,
+                LeaveBalance.year == today.year
+            ))
+            .where(Employee.id == employee_id)
+        ).first()
+        employee, leave_type, balance = row if row is not None else (None, None, None)
+        if employee is None or leave_type is None:
+            return self._build_validation_result(employee, leave_type, None, [], [], leave_request, today, detail)
+        
+        overlapping_requests = self._fetch_overlapping_requests(employee_id, leave_request.start_date, leave_request.end_date)
+        holidays = self._fetch_holidays(leave_request.start_date, leave_request.end_date)
+        return self._build_validation_result(employee, leave_type, balance, overlapping_requests, holidays, leave_request, today, detail)
+    
+    def validate_leave_request_comprehensive_bulk(self, requests: List[Tuple[int, LeaveRequestCreate]], detail: bool = True) -> List[Dict[str, Any]]:
+        """Comprehensive validation of many leave requests, one query per table"""
+        if not requests:
+            return []
+        
+        today = date.today()
+        current_year = today.year
+        employee_ids = {employee_id for employee_id, _ in requests}
+        leave_type_ids = {leave_request.leave_type_id for _, leave_request in requests}
+        balance_keys = {(employee_id, leave_request.leave_type_id) for employee_id, leave_request in requests}
+        
+        employees = {e.id: e for e in self.db.scalars(select(Employee).where(Employee.id.in_(employee_ids)))}
+        leave_types = {lt.id: lt for lt in self.db.scalars(select(LeaveType).where(LeaveType.id.in_(leave_type_ids)))}
+        balances = {
+            (b.employee_id, b.leave_type_id): b
+            for b in self.db.scalars(
+                select(LeaveBalance).where(
+                    LeaveBalance.year == current_year,
+                    tuple_(LeaveBalance.employee_id, LeaveBalance.leave_type_id).in_(balance_keys)
+                )
+            )
+        }
+        
+        # One statement covers every request's window; each result then keeps only its own overlaps
+        candidates = self.db.scalars(
+            select(LeaveRequest).options(joinedload(LeaveRequest.leave_type)).where(
+                LeaveRequest.status.in_(_ACTIVE_STATUSES),
+                or_(*(
+                    and_(
+                        LeaveRequest.employee_id == employee_id,
+                        LeaveRequest.start_date <= leave_request.end_date,
+                        LeaveRequest.end_date >= leave_request.start_date
+                    )
+                    for employee_id, leave_request in requests
+                ))
+            )
+        ).all()
+        requests_by_employee: Dict[int, List[LeaveRequest]] = {}
+        for req in candidates:
+            requests_by_employee.setdefault(req.employee_id, []).append(req)
+        
+        holidays = self._fetch_holidays(
+            min(leave_request.start_date for _, leave_request in requests),
+            max(leave_request.end_date for _, leave_request in requests)
+        )
+        
+        results = []
+        for employee_id, leave_request in requests:
+            start_date, end_date = leave_request.start_date, leave_request.end_date
+            overlapping_requests = [
+                req for req in requests_by_employee.get(employee_id, [])
+                if as_date(req.start_date) <= end_date and as_date(req.end_date) >= start_date
+            ]
+            request_holidays = [h for h in holidays if start_date <= as_date(h.date) <= end_date]
+            results.append(self._build_validation_result(
+                employees.get(employee_id),
+                leave_types.get(leave_request.leave_type_id),
+                balances.get((employee_id, leave_request.leave_type_id)),
+                overlapping_requests,
+                request_holidays,
+                leave_request,
+                today,
+                detail
+            ))
+        return results
+    
+    def _build_validation_result(
+        self,
+        employee: Optional[Employee],
+        leave_type: Optional[LeaveType],
+        balance: Optional[LeaveBalance],
+        overlapping_requests: List[LeaveRequest],
+        holidays: List[Row],
+        leave_request: LeaveRequestCreate,
+        today: date,
+        detail: bool = True
+    ) -> Dict[str, Any]:
+        """Run every validator against pre-fetched rows"""
         
         validation_result = {
             "is_valid": True,
             "errors": [],
             "warnings": [],
-            "suggestions": [],
-            "validation_details": {}
+            "suggestions": []
         }
+        if detail:
+            validation_result["validation_details"] = {}
         
-        # Get employee
-        employee = self.db.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
+        if employee is None:
             validation_result["is_valid"] = False
             validation_result["errors"].append("Employee not found")
             return validation_result
         
-        # Get leave type
-        leave_type = self.db.query(LeaveType).filter(LeaveType.id == leave_request.leave_type_id).first()
-        if not leave_type:
+        if leave_type is None:
             validation_result["is_valid"] = False
             validation_result["errors"].append("Invalid leave type")
             return validation_result
         
         # Calculate requested days
-        requested_days = (leave_request.end_date - leave_request.start_date).days + 1
-        
-        # 1. Date validation
-        date_validation = self._validate_dates(leave_request.start_date, leave_request.end_date)
-        validation_result["validation_details"]["date_validation"] = date_validation
-        if not date_validation["is_valid"]:
-            validation_result["is_valid"] = False
-            validation_result["errors"].extend(date_validation["errors"])
-        
-        # 2. Leave type specific validation
-        leave_type_validation = self._validate_leave_type_rules(leave_type, requested_days, leave_request)
-        validation_result["validation_details"]["leave_type_validation"] = leave_type_validation
-        if not leave_type_validation["is_valid"]:
-            validation_result["is_valid"] = False
-            validation_result["errors"].extend(leave_type_validation["errors"])
-        
-        # 3. Balance validation
-        balance_validation = self._validate_leave_balance(employee_id, leave_request.leave_type_id, requested_days)
-        validation_result["validation_details"]["balance_validation"] = balance_validation
-        if not balance_validation["is_valid"]:
-            validation_result["is_valid"] = False
-            validation_result["errors"].extend(balance_validation["errors"])
-        
-        # 4. Conflict validation
-        conflict_validation = self._validate_conflicts(employee_id, leave_request.start_date, leave_request.end_date)
-        validation_result["validation_details"]["conflict_validation"] = conflict_validation
-        if not conflict_validation["is_valid"]:
-            validation_result["is_valid"] = False
-            validation_result["errors"].extend(conflict_validation["errors"])
-        
-        # 5. Holiday validation
-        holiday_validation = self._validate_holidays(leave_request.start_date, leave_request.end_date)
-        validation_result["validation_details"]["holiday_validation"] = holiday_validation
-        if not holiday_validation["is_valid"]:
-            validation_result["is_valid"] = False
-            validation_result["errors"].extend(holiday_validation["errors"])
-        
-        # 6. Business rules validation
-        business_rules_validation = self._validate_business_rules(employee, leave_request, requested_days)
-        validation_result["validation_details"]["business_rules_validation"] = business_rules_validation
-        if not business_rules_validation["is_valid"]:
-            validation_result["is_valid"] = False
-            validation_result["errors"].extend(business_rules_validation["errors"])
-        
-        # 7. Generate suggestions
-        suggestions = self._generate_suggestions(employee, leave_type, leave_request, requested_days)
+        requested_days = leave_day_count(leave_request.start_date, leave_request.end_date)
+        
+        date_validation = self._validate_dates(leave_request.start_date, leave_request.end_date, today)
+        if detail:
+            # Working days in the range, from the holidays already fetched for the holiday check
+            date_validation["business_days"] = count_business_days(leave_request.start_date, leave_request.end_date, holidays)
+        
+        checks = {
+            "date_validation": date_validation,
+            "leave_type_validation": self._validate_leave_type_rules(leave_type, requested_days, leave_request),
+            "balance_validation": self._validate_leave_balance(balance, requested_days),
+            "conflict_validation": self._validate_conflicts(overlapping_requests),
+            "holiday_validation": self._validate_holidays(holidays),
+            "business_rules_validation": self._validate_business_rules(employee, leave_request, requested_days, today)
+        }
+        for check in checks.values():
+            if not check["is_valid"]:
+                validation_result["is_valid"] = False
+                validation_result["errors"].extend(check["errors"])
+        if detail:
+            validation_result["validation_details"] = checks
+        
+        # Generate suggestions
+        suggestions = self._generate_suggestions(balance, leave_request, requested_days, today)
         validation_result["suggestions"] = suggestions
         
         return validation_result
     
-    def _validate_dates(self, start_date: date, end_date: date) -> Dict[str, Any]:
+    def _validate_dates(self, start_date: date, end_date: date, today: date) -> Dict[str, Any]:
         """Validate date logic"""
         result = {"is_valid": True, "errors": [], "warnings": []}
         
         # Check if start date is in the past
-        if start_date < date.today():
+        if start_date < today:
             result["is_valid"] = False
             result["errors"].append("Start date cannot be in the past")
         
@@ -105,7 +198,7 @@ class BusinessRuleValidationService:
             result["errors"].append("End date cannot be before start date")
         
         # Check if dates are too far in the future (more than 1 year)
-        if start_date > date.today() + timedelta(days=365):
+        if start_date > today + FUTURE_REQUEST_WARNING:
             result["warnings"].append("Start date is more than 1 year in the future")
         
         # Check if request is for weekend only
@@ -129,24 +222,15 @@ class BusinessRuleValidationService:
             result["errors"].append("Medical certificate is required for this leave type")
         
         # Check if reason is provided for certain leave types
-        if leave_type.name.lower() in ["sick leave", "emergency leave"] and not leave_request.reason:
+        if leave_type.name.lower() in _REASON_REQUIRED_TYPES and not leave_request.reason:
             result["warnings"].append("Reason is recommended for this leave type")
         
         return result
     
-    def _validate_leave_balance(self, employee_id: int, leave_type_id: int, requested_days: int) -> Dict[str, Any]:
+    def _validate_leave_balance(self, balance: Optional[LeaveBalance], requested_days: int) -> Dict[str, Any]:
         """Validate leave balance"""
         result = {"is_valid": True, "errors": [], "warnings": [], "balance_info": {}}
         
-        current_year = date.today().year
-        balance = self.db.query(LeaveBalance).filter(
-            and_(
-                LeaveBalance.employee_id == employee_id,
-                LeaveBalance.leave_type_id == leave_type_id,
-                LeaveBalance.year == current_year
-            )
-        ).first()
-        
         if not balance:
             result["is_valid"] = False
             result["errors"].append("No leave balance found for this leave type")
@@ -162,26 +246,26 @@ class BusinessRuleValidationService:
         if balance.remaining_balance < requested_days:
             result["is_valid"] = False
             result["errors"].append(f"Insufficient balance. Available: {balance.remaining_balance}, Requested: {requested_days}")
-        elif balance.remaining_balance < requested_days + 5:
+        elif balance.remaining_balance < requested_days + LOW_BALANCE_MARGIN_DAYS:
             result["warnings"].append("Low balance remaining after this request")
         
         return result
     
-    def _validate_conflicts(self, employee_id: int, start_date: date, end_date: date) -> Dict[str, Any]:
-        """Validate for overlapping requests"""
-        result = {"is_valid": True, "errors": [], "warnings": [], "conflicts": []}
-        
-        overlapping_requests = self.db.query(LeaveRequest).filter(
-            and_(
+    def _fetch_overlapping_requests(self, employee_id: int, start_date: date, end_date: date) -> List[LeaveRequest]:
+        """Pending or approved requests overlapping the range, with their leave types"""
+        # Overlaps are few, so the leave type names are joined into the same statement
+        return self.db.scalars(
+            select(LeaveRequest).options(joinedload(LeaveRequest.leave_type)).where(
                 LeaveRequest.employee_id == employee_id,
-                LeaveRequest.status.in_([LeaveStatus.PENDING, LeaveStatus.APPROVED]),
-                or_(
-                    and_(LeaveRequest.start_date <= start_date, LeaveRequest.end_date >= start_date),
-                    and_(LeaveRequest.start_date <= end_date, LeaveRequest.end_date >= end_date),
-                    and_(LeaveRequest.start_date >= start_date, LeaveRequest.end_date <= end_date)
-                )
+                LeaveRequest.status.in_(_ACTIVE_STATUSES),
+                LeaveRequest.start_date <= end_date,
+                LeaveRequest.end_date >= start_date
             )
         ).all()
+    
+    def _validate_conflicts(self, overlapping_requests: List[LeaveRequest]) -> Dict[str, Any]:
+        """Validate for overlapping requests"""
+        result = {"is_valid": True, "errors": [], "warnings": [], "conflicts": []}
         
         if overlapping_requests:
             result["is_valid"] = False
@@ -199,18 +283,14 @@ class BusinessRuleValidationService:
         
         return result
     
-    def _validate_holidays(self, start_date: date, end_date: date) -> Dict[str, Any]:
+    def _fetch_holidays(self, start_date: date, end_date: date) -> List[Row]:
+        """Active holidays falling inside the range"""
+        return get_holidays_in_range(self.db, start_date, end_date)
+    
+    def _validate_holidays(self, conflicting_holidays: List[Row]) -> Dict[str, Any]:
         """Validate for holiday conflicts"""
         result = {"is_valid": True, "errors": [], "warnings": [], "holidays": []}
         
-        conflicting_holidays = self.db.query(Holiday).filter(
-            and_(
-                Holiday.is_active == True,
-                Holiday.date >= start_date,
-                Holiday.date <= end_date
-            )
-        ).all()
-        
         if conflicting_holidays:
             result["is_valid"] = False
             result["errors"].append(f"Request conflicts with {len(conflicting_holidays)} holiday(s)")
@@ -225,7 +305,7 @@ class BusinessRuleValidationService:
         
         return result
     
-    def _validate_business_rules(self, employee: Employee, leave_request: LeaveRequestCreate, requested_days: int) -> Dict[str, Any]:
+    def _validate_business_rules(self, employee: Employee, leave_request: LeaveRequestCreate, requested_days: int, today: date) -> Dict[str, Any]:
         """Validate business rules"""
         result = {"is_valid": True, "errors": [], "warnings": []}
         
@@ -234,23 +314,22 @@ class BusinessRuleValidationService:
             result["is_valid"] = False
             result["errors"].append("Employee is not active")
         
-        # Check probation period (assuming 90 days)
-        hire_date = employee.hire_date.date() if hasattr(employee.hire_date, 'date') else employee.hire_date
-        probation_end = hire_date + timedelta(days=90)
-        if date.today() < probation_end:
+        # Check probation period
+        probation_end = as_date(employee.hire_date) + PROBATION_PERIOD
+        if today < probation_end:
             result["warnings"].append("Employee is still in probation period")
         
-        # Check if request is for too many days (more than 30)
-        if requested_days > 30:
-            result["warnings"].append("Request is for more than 30 days - may require special approval")
+        # Check if request is for too many days
+        if requested_days > LONG_REQUEST_DAYS:
+            result["warnings"].append(f"Request is for more than {LONG_REQUEST_DAYS} days - may require special approval")
         
-        # Check if request is during peak business period (example: December)
-        if leave_request.start_date.month == 12:
+        # Check if request is during peak business period
+        if leave_request.start_date.month in PEAK_MONTHS:
             result["warnings"].append("Request is during peak business period")
         
         return result
     
-    def _generate_suggestions(self, employee: Employee, leave_type: LeaveType, leave_request: LeaveRequestCreate, requested_days: int) -> List[str]:
+    def _generate_suggestions(self, balance: Optional[LeaveBalance], leave_request: LeaveRequestCreate, requested_days: int, today: date) -> List[str]:
         """Generate suggestions for the leave request"""
         suggestions = []
         
@@ -259,21 +338,12 @@ class BusinessRuleValidationService:
             suggestions.append("Consider starting on a weekday to maximize work days")
         
         # Suggest shorter duration if balance is low
-        current_year = date.today().year
-        balance = self.db.query(LeaveBalance).filter(
-            and_(
-                LeaveBalance.employee_id == employee.id,
-                LeaveBalance.leave_type_id == leave_type.id,
-                LeaveBalance.year == current_year
-            )
-        ).first()
-        
-        if balance and balance.remaining_balance < requested_days + 5:
+        if balance and balance.remaining_balance < requested_days + LOW_BALANCE_MARGIN_DAYS:
             suggestions.append("Consider splitting the leave into smaller periods")
         
         # Suggest advance notice
-        days_advance = (leave_request.start_date - date.today()).days
-        if days_advance < 7:
+        days_advance = (leave_request.start_date - today).days
+        if days_advance < MIN_ADVANCE_NOTICE_DAYS:
             suggestions.append("Consider giving more advance notice for better planning")
         
         return suggestions
@@ -303,32 +373,41 @@ class LeavePolicyService:
         
         # Get leave requests for current year
         # SQLite doesn't have year() function, so we'll filter by date range
-        year_start = date(current_year, 1, 1)
-        year_end = date(current_year, 12, 31)
-        leave_requests = self.db.query(LeaveRequest).filter(
-            and_(
+        year_start, year_end = year_range(current_year)
+        # Counts and approved days per status are aggregated in SQL; at most one row per status
+        status_rows = self.db.execute(
+            select(
+                LeaveRequest.status,
+                func.count(LeaveRequest.id),
+                func.sum(LeaveRequest.total_days)
+            ).where(
                 LeaveRequest.employee_id == employee_id,
                 LeaveRequest.start_date >= year_start,
                 LeaveRequest.start_date <= year_end
-            )
+            ).group_by(LeaveRequest.status)
         ).all()
         
-        # Calculate statistics
-        total_requests = len(leave_requests)
-        approved_requests = len([r for r in leave_requests if r.status == LeaveStatus.APPROVED])
-        pending_requests = len([r for r in leave_requests if r.status == LeaveStatus.PENDING])
-        rejected_requests = len([r for r in leave_requests if r.status == LeaveStatus.REJECTED])
+        status_counts = {status: count for status, count, _ in status_rows}
+        total_days_used = next((days for status, _, days in status_rows if status == LeaveStatus.APPROVED), 0)
+        total_requests = sum(status_counts.values())
+        approved_requests = status_counts.get(LeaveStatus.APPROVED, 0)
+        pending_requests = status_counts.get(LeaveStatus.PENDING, 0)
+        rejected_requests = status_counts.get(LeaveStatus.REJECTED, 0)
         
-        # Calculate total days used
-        total_days_used = sum([r.total_days for r in leave_requests if r.status == LeaveStatus.APPROVED])
+        # Policy limits across the employee's leave types, gathered in one pass
+        max_consecutive_days = 0
+        medical_certificate_required = False
+        for balance in leave_balances:
+            max_consecutive_days = max(max_consecutive_days, balance.leave_type.max_consecutive_days or 0)
+            medical_certificate_required = medical_certificate_required or balance.leave_type.requires_medical_certificate
         
         return {
             "employee": {
                 "id": employee.id,
-                "name": f"{employee.first_name} {employee.last_name}",
+                "name": employee.full_name,
                 "department": employee.department,
                 "position": employee.position,
-                "hire_date": employee.hire_date.isoformat() if hasattr(employee.hire_date, 'isoformat') else str(employee.hire_date),
+                "hire_date": as_date(employee.hire_date).isoformat(),
                 "is_active": employee.is_active
             },
             "leave_balances": [
@@ -352,9 +431,41 @@ class LeavePolicyService:
                 "approval_rate": (approved_requests / total_requests * 100) if total_requests > 0 else 0
             },
             "policy_rules": {
-                "max_consecutive_days": max([b.leave_type.max_consecutive_days or 0 for b in leave_balances]),
+                "max_consecutive_days": max_consecutive_days,
                 "requires_advance_notice": True,
-                "medical_certificate_required": any([b.leave_type.requires_medical_certificate for b in leave_balances]),
-                "probation_period_days": 90
+                "medical_certificate_required": medical_certificate_required,
+                "probation_period_days": PROBATION_DAYS
             }
         }
+    
+    def bulk_allocate_balances(self, year: int, allocations: List[Dict[str, Any]]) -> int:
+        """Set the yearly allocation for many employees in batched upserts.
+
+        Each allocation holds employee_id, leave_type_id and total_allocated.
+        Missing balances are created; existing ones keep their used and carried
+        forward days and have the remaining balance recomputed. When an employee
+        and leave type appear more than once, the last allocation wins.
+        """
+        # One row per balance key: a single upsert statement may not touch the same row twice
+        latest = {(allocation["employee_id"], allocation["leave_type_id"]): allocation for allocation in allocations}
+        rows = [
+            {
+                "employee_id": employee_id,
+                "leave_type_id": leave_type_id,
+                "year": year,
+                "total_allocated": allocation["total_allocated"],
+                "total_used": 0,
+                "total_carried_forward": 0,
+                "remaining_balance": allocation["total_allocated"]
+            }
+            for (employee_id, leave_type_id), allocation in latest.items()
+        ]
+        balances = LeaveBalance.__table__.c
+        upsert_leave_balances(self.db, rows, lambda new: {
+            "total_allocated": new.total_allocated,
+            "remaining_balance": new.total_allocated + balances.total_carried_forward - balances.total_used,
+            "updated_at": func.now()
+        })
+        self.db.commit()
+        invalidate_policy_summary()
+        return len(rows)
@@ -1,16 +1,47 @@
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from threading import Lock
+from datetime import date, datetime
 from app.models import LeaveRequest, Employee, LeaveStatus
 from app.schemas.leave_management import LeaveRequestWithDetails
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Notifications kept in memory, overall and per type or employee; older ones are dropped
+NOTIFICATION_LOG_SIZE = 10_000
+
+# Reminder blasts render and send this many emails at a time
+REMINDER_WORKERS = 32
+
+# Fixed text shared by every email body
+SYSTEM_NAME = "Leave Management System"
+SIGNOFF = f"Best regards,\n{SYSTEM_NAME}"
+
+def _format_date(value: date) -> str:
+    """YYYY-MM-DD for a date or the date part of a datetime, without strftime"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
 class EmailNotificationService:
     """Service for simulating email notifications for leave management"""
     
     def __init__(self):
-        self.notification_log = []
+        self.notification_log = deque(maxlen=NOTIFICATION_LOG_SIZE)
+        self._by_type = defaultdict(lambda: deque(maxlen=NOTIFICATION_LOG_SIZE))
+        self._by_employee = defaultdict(lambda: deque(maxlen=NOTIFICATION_LOG_SIZE))
+        self._lock = Lock()
+    
+    def _record(self, notification: Dict[str, Any]):
+        """Append a sent notification to the log and its type and employee indexes"""
+        with self._lock:
+            self.notification_log.append(notification)
+            self._by_type[notification["type"]].append(notification)
+            if notification.get("employee_id") is not None:
+                self._by_employee[notification["employee_id"]].append(notification)
     
     def send_leave_request_notification(self, leave_request: LeaveRequestWithDetails, manager: Employee) -> bool:
         """Send notification to manager about new leave request"""
@@ -29,7 +60,7 @@ class EmailNotificationService:
                 "employee_id": leave_request.employee_id
             }
             
-            self.notification_log.append(notification)
+            self._record(notification)
             logger.info(f"Email notification sent to {manager.email} for leave request {leave_request.id}")
             
             return True
@@ -56,7 +87,7 @@ class EmailNotificationService:
                 "status": leave_request.status.value
             }
             
-            self.notification_log.append(notification)
+            self._record(notification)
             logger.info(f"Email notification sent to {leave_request.employee.email} for leave request {leave_request.id}")
             
             return True
@@ -80,7 +111,7 @@ class EmailNotificationService:
                 "employee_id": employee.id
             }
             
-            self.notification_log.append(notification)
+            self._record(notification)
             logger.info(f"Leave balance reminder sent to {employee.email}")
             
             return True
@@ -88,6 +119,17 @@ class EmailNotificationService:
             logger.error(f"Error sending leave balance reminder: {str(e)}")
             return False
     
+    def send_balance_reminders_bulk(self, reminders: List[Tuple[Employee, list]]) -> List[bool]:
+        """Send balance reminders concurrently, results in input order.
+
+        Each balance's leave_type must already be loaded; worker threads
+        must not lazy-load through the caller's session.
+        """
+        if not reminders:
+            return []
+        with ThreadPoolExecutor(max_workers=min(REMINDER_WORKERS, len(reminders))) as executor:
+            return list(executor.map(lambda reminder: self.send_leave_balance_reminder(*reminder), reminders))
+    
     def send_delegation_notification(self, manager: Employee, delegate: Employee, delegation_period: str) -> bool:
         """Send notification about leave delegation"""
         try:
@@ -105,7 +147,7 @@ class EmailNotificationService:
                 "delegate_id": delegate.id
             }
             
-            self.notification_log.append(notification)
+            self._record(notification)
             logger.info(f"Delegation notification sent to {delegate.email}")
             
             return True
@@ -124,15 +166,14 @@ Leave Details:
 - Employee: {leave_request.employee.first_name} {leave_request.employee.last_name} ({leave_request.employee.employee_id})
 - Department: {leave_request.employee.department}
 - Leave Type: {leave_request.leave_type.name}
-- Start Date: {leave_request.start_date.strftime('%Y-%m-%d')}
-- End Date: {leave_request.end_date.strftime('%Y-%m-%d')}
+- Start Date: {_format_date(leave_request.start_date)}
+- End Date: {_format_date(leave_request.end_date)}
 - Total Days: {leave_request.total_days}
 - Reason: {leave_request.reason or 'Not specified'}
 
 Please review and approve/reject this request through the leave management system.
 
-Best regards,
-Leave Management System
+{SIGNOFF}
         """.strip()
     
     def _generate_approval_email(self, leave_request: LeaveRequestWithDetails, approver: Employee) -> str:
@@ -147,8 +188,8 @@ Your leave request has been {status_text} by {approver_name}.
 
 Leave Details:
 - Leave Type: {leave_request.leave_type.name}
-- Start Date: {leave_request.start_date.strftime('%Y-%m-%d')}
-- End Date: {leave_request.end_date.strftime('%Y-%m-%d')}
+- Start Date: {_format_date(leave_request.start_date)}
+- End Date: {_format_date(leave_request.end_date)}
 - Total Days: {leave_request.total_days}
 - Status: {leave_request.status.value.title()}
 """
@@ -156,11 +197,10 @@ Leave Details:
         if leave_request.status == LeaveStatus.REJECTED and leave_request.rejection_reason:
             message += f"- Rejection Reason: {leave_request.rejection_reason}\n"
         
-        message += """
+        message += f"""
 Please contact your manager if you have any questions.
 
-Best regards,
-Leave Management System
+{SIGNOFF}
         """.strip()
         
         return message
@@ -168,24 +208,25 @@ Leave Management System
     def _generate_balance_reminder_email(self, employee: Employee, leave_balances: list) -> str:
         """Generate email content for leave balance reminder"""
         current_year = datetime.now().year
+        balance_lines = "".join(
+            f"- {balance.leave_type.name}: {balance.remaining_balance} days remaining\n"
+            for balance in leave_balances
+        )
+        used_count = sum(1 for balance in leave_balances if balance.total_used > 0)
         
         message = f"""
 Dear {employee.first_name} {employee.last_name},
 
 This is a reminder about your leave balances for {current_year}:
 
-"""
-        
-        for balance in leave_balances:
-            message += f"- {balance.leave_type.name}: {balance.remaining_balance} days remaining\n"
+{balance_lines}"""
         
         message += f"""
-Total leave requests this year: {sum(len([b for b in leave_balances if b.total_used > 0]) for _ in [1])}
+Total leave requests this year: {used_count}
 
 Please plan your leave requests accordingly and ensure you have sufficient balance for your planned time off.
 
-Best regards,
-Leave Management System
+{SIGNOFF}
         """.strip()
         
         return message
@@ -206,25 +247,30 @@ During this time, you will be responsible for:
 
 Please log into the leave management system to review any pending requests.
 
-Best regards,
-Leave Management System
+{SIGNOFF}
         """.strip()
     
     def get_notification_history(self, limit: int = 100) -> list:
-        """Get notification history"""
-        return self.notification_log[-limit:] if limit else self.notification_log
+        """Get notification history, oldest first"""
+        if not limit:
+            return list(self.notification_log)
+        history = list(islice(reversed(self.notification_log), limit))
+        history.reverse()
+        return history
     
     def get_notifications_by_type(self, notification_type: str) -> list:
         """Get notifications by type"""
-        return [n for n in self.notification_log if n["type"] == notification_type]
+        return list(self._by_type.get(notification_type, ()))
     
     def get_notifications_by_employee(self, employee_id: int) -> list:
         """Get notifications related to a specific employee"""
-        return [n for n in self.notification_log if n.get("employee_id") == employee_id]
+        return list(self._by_employee.get(employee_id, ()))
     
     def clear_notification_log(self):
         """Clear notification history (for testing purposes)"""
         self.notification_log.clear()
+        self._by_type.clear()
+        self._by_employee.clear()
         logger.info("Notification log cleared")
 
 # Global instance
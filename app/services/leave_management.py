@@ -1,17 +1,254 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional, Tuple
-from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload
+from sqlalchemy import Row, bindparam, exists, func, insert, literal, select, true, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime, date, time, timedelta
+from functools import cached_property, lru_cache
+from bisect import bisect_left, bisect_right
+from types import SimpleNamespace
 from app.models import Employee, LeaveType, LeaveRequest, LeaveBalance, Holiday, LeaveDelegation, LeaveStatus
 from app.schemas.leave_management import (
     LeaveRequestCreate, LeaveRequestUpdate, LeaveApprovalRequest,
     LeaveBalanceCreate, LeaveBalanceUpdate, EmployeeLeaveSummary
 )
 from app.services.email_notification import email_service
+from fastapi import BackgroundTasks
+from app.core.cache import cache
+from app.db.init_db import has_leave_balance_key
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Relationships serialized by LeaveRequestWithDetails are batch-loaded for list
+# queries; any other lazy load on those rows raises instead of issuing per-row queries.
+LEAVE_REQUEST_LIST_OPTIONS = (
+    selectinload(LeaveRequest.employee),
+    selectinload(LeaveRequest.leave_type),
+    selectinload(LeaveRequest.approver),
+    raiseload("*"),
+)
+
+# Single-row fetches join the same relationships into one statement
+LEAVE_REQUEST_DETAIL_OPTIONS = (
+    joinedload(LeaveRequest.employee),
+    joinedload(LeaveRequest.leave_type),
+    joinedload(LeaveRequest.approver),
+)
+
+# Everything the notification emails read, including the employee's manager,
+# loaded with the request in one statement after it is written.
+LEAVE_REQUEST_NOTIFICATION_OPTIONS = (
+    joinedload(LeaveRequest.employee).joinedload(Employee.manager),
+    joinedload(LeaveRequest.leave_type),
+    joinedload(LeaveRequest.approver),
+)
+
+# Column projection behind LeaveRequestListItem; list endpoints read these rows
+# directly instead of hydrating requests plus their employee and leave type.
+LEAVE_REQUEST_LIST_ITEM_SELECT = select(
+    LeaveRequest.id,
+    LeaveRequest.employee_id,
+    Employee.full_name.label("employee_name"),
+    LeaveRequest.leave_type_id,
+    LeaveType.name.label("leave_type_name"),
+    LeaveRequest.start_date,
+    LeaveRequest.end_date,
+    LeaveRequest.total_days,
+    LeaveRequest.status,
+    LeaveRequest.created_at,
+).join(Employee, LeaveRequest.employee_id == Employee.id).join(LeaveType, LeaveRequest.leave_type_id == LeaveType.id)
+
+LEAVE_BALANCE_LIST_OPTIONS = (
+    selectinload(LeaveBalance.employee),
+    selectinload(LeaveBalance.leave_type),
+    raiseload("*"),
+)
+
+# Employee-code lookups are built once and take the code as a bound parameter,
+# so every call reuses the same cached compiled statement
+EMPLOYEE_ID_BY_CODE = select(Employee.id).where(Employee.employee_id == bindparam("code"))
+EMPLOYEE_BY_CODE = select(Employee).where(Employee.employee_id == bindparam("code"))
+LEAVE_TYPE_BY_ID = select(*LeaveType.__table__.c).where(LeaveType.id == bindparam("id"))
+
+# Employee codes are never reassigned, so resolved ids can be cached for long
+EMPLOYEE_CODE_TTL = 3600
+POLICY_SUMMARY_TTL = 60
+# Leave types and holidays change rarely; admin writes clear the leave_types:* and holidays:* keys
+REFERENCE_DATA_TTL = 300
+BULK_INSERT_BATCH_SIZE = 500
+# Holiday lookups spanning more calendar years than this skip the per-year cache
+HOLIDAY_CACHE_MAX_YEARS = 3
+
+def resolve_employee_id(db: Session, employee_code: str) -> Optional[int]:
+    """Translate an employee code (e.g. EMP008) to its primary key, caching hits"""
+    key = f"emp:code:{employee_code}"
+    employee_id = cache.get(key)
+    if employee_id is None:
+        employee_id = db.scalar(EMPLOYEE_ID_BY_CODE, {"code": employee_code})
+        if employee_id is not None:
+            cache.set(key, employee_id, ttl=EMPLOYEE_CODE_TTL)
+    return employee_id
+
+def get_employee_by_code(db: Session, employee_code: str) -> Optional[Employee]:
+    """Load an employee by code in one query, reusing a cached id for a primary-key get"""
+    employee_id = cache.get(f"emp:code:{employee_code}")
+    if employee_id is not None:
+        return db.get(Employee, employee_id)
+    employee = db.scalar(EMPLOYEE_BY_CODE, {"code": employee_code})
+    if employee is not None:
+        cache.set(f"emp:code:{employee_code}", employee.id, ttl=EMPLOYEE_CODE_TTL)
+    return employee
+
+@lru_cache(maxsize=32)
+def year_range(year: int) -> Tuple[date, date]:
+    """First and last day of a year, for SARGable range filters"""
+    return date(year, 1, 1), date(year, 12, 31)
+
+def as_date(value) -> date:
+    """Date part of a DateTime column value; stored leave and holiday dates are DateTime"""
+    return value.date() if isinstance(value, datetime) else value
+
+def get_leave_type(db: Session, leave_type_id: int) -> Optional[Row]:
+    """Leave type columns by id, cached as a plain row so it outlives the session"""
+    key = f"leave_types:id:{leave_type_id}"
+    leave_type = cache.get(key)
+    if leave_type is None:
+        leave_type = db.execute(LEAVE_TYPE_BY_ID, {"id": leave_type_id}).first()
+        if leave_type is not None:
+            cache.set(key, leave_type, ttl=REFERENCE_DATA_TTL)
+    return leave_type
+
+def _select_holidays(db: Session, start_date: date, end_date: date) -> List[Row]:
+    """Active holidays between two dates inclusive, sorted by date"""
+    # Holiday.date is DateTime; bounding by the end of the last day keeps that day's
+    # stored midnight value and never builds a date past date.max
+    return db.execute(
+        select(Holiday.name, Holiday.date, Holiday.description).where(
+            Holiday.is_active == True,
+            Holiday.date >= start_date,
+            Holiday.date <= datetime.combine(end_date, time.max)
+        ).order_by(Holiday.date)
+    ).all()
+
+def get_holidays_in_range(db: Session, start_date: date, end_date: date) -> List[Row]:
+    """Active holidays between two dates inclusive, filtered from a per-year cache"""
+    if end_date.year - start_date.year + 1 > HOLIDAY_CACHE_MAX_YEARS:
+        # Long ranges are rare; one range query beats filling the cache year by year
+        return _select_holidays(db, start_date, end_date)
+    holidays = []
+    for year in range(start_date.year, end_date.year + 1):
+        key = f"holidays:year:{year}"
+        rows = cache.get(key)
+        if rows is None:
+            rows = _select_holidays(db, date(year, 1, 1), date(year, 12, 31))
+            cache.set(key, rows, ttl=REFERENCE_DATA_TTL)
+        # Rows are sorted by date, so the range is a slice found by bisection
+        lo = bisect_left(rows, start_date, key=lambda h: as_date(h.date))
+        hi = bisect_right(rows, end_date, key=lambda h: as_date(h.date))
+        holidays.extend(rows[lo:hi])
+    return holidays
+
+def leave_day_count(start_date: date, end_date: date) -> int:
+    """Days a leave request takes from the balance: calendar days, both ends inclusive"""
+    return (end_date - start_date).days + 1
+
+def count_business_days(start_date: date, end_date: date, holidays: List[Row]) -> int:
+    """Weekdays between two dates inclusive, less the given holidays that fall on a weekday"""
+    if end_date < start_date:
+        return 0
+    full_weeks, extra_days = divmod((end_date - start_date).days + 1, 7)
+    first_weekday = start_date.weekday()
+    weekdays = full_weeks * 5 + sum(1 for i in range(extra_days) if (first_weekday + i) % 7 < 5)
+    holiday_dates = {as_date(h.date) for h in holidays}
+    return weekdays - sum(1 for d in holiday_dates if start_date <= d <= end_date and d.weekday() < 5)
+
+# Engines whose leave_balances table is known to have the (employee_id, year, leave_type_id) key
+_BALANCE_KEY_BINDS = set()
+
+def _has_balance_key(db: Session) -> bool:
+    """Whether the upsert can rely on the unique key; positive answers are remembered per engine"""
+    bind = db.get_bind()
+    if bind not in _BALANCE_KEY_BINDS:
+        if not has_leave_balance_key(db.connection()):
+            return False
+        _BALANCE_KEY_BINDS.add(bind)
+    return True
+
+def upsert_leave_balances(db: Session, rows: List[dict], on_conflict: Callable) -> None:
+    """Insert balance rows, updating the existing (employee_id, year, leave_type_id) row instead on conflict.
+
+    `on_conflict(new)` returns the column values to set on an existing row;
+    `new` exposes the columns of the row that was being inserted.
+    """
+    if not _has_balance_key(db):
+        logger.warning("leave_balances has no unique (employee_id, year, leave_type_id) key; run init_db. Upserting without it")
+        _upsert_leave_balances_without_key(db, rows, on_conflict)
+        return
+    dialect = db.get_bind().dialect.name
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        batch = rows[start:start + BULK_INSERT_BATCH_SIZE]
+        if dialect == "mysql":
+            stmt = mysql_insert(LeaveBalance)
+            stmt = stmt.on_duplicate_key_update(on_conflict(stmt.inserted))
+        elif dialect in ("postgresql", "sqlite"):
+            stmt = postgresql_insert(LeaveBalance) if dialect == "postgresql" else sqlite_insert(LeaveBalance)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["employee_id", "year", "leave_type_id"],
+                set_=on_conflict(stmt.excluded)
+            )
+        else:
+            raise NotImplementedError(f"Balance upsert is not supported on {dialect}")
+        db.execute(stmt, batch)
+
+def _upsert_leave_balances_without_key(db: Session, rows: List[dict], on_conflict: Callable) -> None:
+    """upsert_leave_balances for tables without the unique key: look up existing balances, then insert or update"""
+    balances = LeaveBalance.__table__
+    key_columns = (balances.c.employee_id, balances.c.year, balances.c.leave_type_id)
+    # Later rows win, as they would in a sequence of upserts
+    rows_by_key = {(row["employee_id"], row["year"], row["leave_type_id"]): row for row in rows}
+    keys = list(rows_by_key)
+    for start in range(0, len(keys), BULK_INSERT_BATCH_SIZE):
+        batch = keys[start:start + BULK_INSERT_BATCH_SIZE]
+        existing = set(db.execute(select(*key_columns).where(tuple_(*key_columns).in_(batch))).tuples())
+        missing = [rows_by_key[key] for key in batch if key not in existing]
+        if missing:
+            db.execute(insert(LeaveBalance), missing)
+        for key in existing:
+            new = SimpleNamespace(**{column: literal(value) for column, value in rows_by_key[key].items()})
+            db.execute(
+                update(balances).where(*(column == value for column, value in zip(key_columns, key))).values(on_conflict(new))
+            )
+
+def get_reporting_tree(db: Session, root_id: int) -> List[Row]:
+    """Return an employee and everyone below them in one recursive query, with depth from the root"""
+    tree = select(
+        Employee.id, Employee.employee_id, Employee.full_name.label("full_name"), Employee.department,
+        Employee.position, Employee.manager_id, literal(0).label("depth")
+    ).where(Employee.id == root_id).cte("reporting_tree", recursive=True)
+    tree = tree.union_all(
+        select(
+            Employee.id, Employee.employee_id, Employee.full_name.label("full_name"), Employee.department,
+            Employee.position, Employee.manager_id, (tree.c.depth + 1).label("depth")
+        ).join(tree, Employee.manager_id == tree.c.id)
+    )
+    return db.execute(select(tree).order_by(tree.c.depth, tree.c.id)).all()
+
+def _keyset_page(stmt, limit: Optional[int], cursor: Optional[int]):
+    """Order leave requests newest first and fetch one row past `limit` so callers can tell if more remain"""
+    if cursor is not None:
+        stmt = stmt.where(LeaveRequest.id < cursor)
+    stmt = stmt.order_by(LeaveRequest.id.desc())
+    return stmt.limit(limit + 1) if limit is not None else stmt
+
+def invalidate_policy_summary(employee_id: Optional[int] = None):
+    """Drop the cached policy summary for one employee, or for everyone"""
+    if employee_id is None:
+        cache.delete_pattern("policy:*")
+    else:
+        cache.delete(f"policy:{employee_id}")
+
 class LeaveValidationService:
     """Service for validating leave requests"""
     
@@ -20,97 +257,90 @@ class LeaveValidationService:
     
     def validate_leave_request(self, employee_id: int, leave_request: LeaveRequestCreate) -> Tuple[bool, str]:
         """Validate a leave request for conflicts and business rules"""
+        is_valid, message, _ = self.check_leave_request(employee_id, leave_request)
+        return is_valid, message
+    
+    def check_leave_request(self, employee_id: int, leave_request: LeaveRequestCreate) -> Tuple[bool, str, int]:
+        """Validate a leave request and return the number of days it takes from the balance"""
+        start_date, end_date = leave_request.start_date, leave_request.end_date
         
         # Check for overlapping requests
-        overlap_check = self._check_overlapping_requests(employee_id, leave_request.start_date, leave_request.end_date)
+        overlap_check = self._check_overlapping_requests(employee_id, start_date, end_date)
         if not overlap_check[0]:
-            return False, overlap_check[1]
+            return False, overlap_check[1], 0
         
         # Check for holiday conflicts
-        holiday_check = self._check_holiday_conflicts(leave_request.start_date, leave_request.end_date)
+        holidays = get_holidays_in_range(self.db, start_date, end_date)
+        holiday_check = self._check_holiday_conflicts(holidays)
         if not holiday_check[0]:
-            return False, holiday_check[1]
+            return False, holiday_check[1], 0
+        
+        requested_days = leave_day_count(start_date, end_date)
         
         # Check leave balance
-        balance_check = self._check_leave_balance(employee_id, leave_request.leave_type_id, leave_request.start_date, leave_request.end_date)
+        balance_check = self._check_leave_balance(employee_id, leave_request.leave_type_id, requested_days)
         if not balance_check[0]:
-            return False, balance_check[1]
+            return False, balance_check[1], 0
         
         # Check leave type rules
-        rules_check = self._check_leave_type_rules(leave_request.leave_type_id, leave_request.start_date, leave_request.end_date)
+        rules_check = self._check_leave_type_rules(leave_request.leave_type_id, requested_days)
         if not rules_check[0]:
-            return False, rules_check[1]
+            return False, rules_check[1], 0
         
-        return True, "Leave request is valid"
+        return True, "Leave request is valid", requested_days
     
     def _check_overlapping_requests(self, employee_id: int, start_date: date, end_date: date) -> Tuple[bool, str]:
         """Check for overlapping leave requests"""
-        overlapping_requests = self.db.query(LeaveRequest).filter(
-            and_(
-                LeaveRequest.employee_id == employee_id,
-                LeaveRequest.status.in_([LeaveStatus.PENDING, LeaveStatus.APPROVED]),
-                or_(
-                    and_(LeaveRequest.start_date <= start_date, LeaveRequest.end_date >= start_date),
-                    and_(LeaveRequest.start_date <= end_date, LeaveRequest.end_date >= end_date),
-                    and_(LeaveRequest.start_date >= start_date, LeaveRequest.end_date <= end_date)
-                )
-            )
-        ).all()
+        overlap = (
+            LeaveRequest.employee_id == employee_id,
+            LeaveRequest.status.in_([LeaveStatus.PENDING, LeaveStatus.APPROVED]),
+            LeaveRequest.start_date <= end_date,
+            LeaveRequest.end_date >= start_date
+        )
         
-        if overlapping_requests:
-            return False, f"Overlapping leave request found. You have {len(overlapping_requests)} conflicting request(s)."
+        # Most requests have no overlap, so probe with EXISTS and only count on a hit
+        if not self.db.scalar(select(exists().where(*overlap))):
+            return True, "No overlapping requests found"
         
-        return True, "No overlapping requests found"
+        conflicting = self.db.scalar(select(func.count(LeaveRequest.id)).where(*overlap))
+        return False, f"Overlapping leave request found. You have {conflicting} conflicting request(s)."
     
-    def _check_holiday_conflicts(self, start_date: date, end_date: date) -> Tuple[bool, str]:
+    def _check_holiday_conflicts(self, conflicting_holidays: List[Row]) -> Tuple[bool, str]:
         """Check for holiday conflicts"""
-        conflicting_holidays = self.db.query(Holiday).filter(
-            and_(
-                Holiday.is_active == True,
-                Holiday.date >= start_date,
-                Holiday.date <= end_date
-            )
-        ).all()
-        
         if conflicting_holidays:
             holiday_names = [h.name for h in conflicting_holidays]
             return False, f"Holiday conflicts detected: {', '.join(holiday_names)}"
         
         return True, "No holiday conflicts"
     
-    def _check_leave_balance(self, employee_id: int, leave_type_id: int, start_date: date, end_date: date) -> Tuple[bool, str]:
+    def _check_leave_balance(self, employee_id: int, leave_type_id: int, requested_days: int) -> Tuple[bool, str]:
         """Check if employee has sufficient leave balance"""
-        current_year = datetime.now().year
+        current_year = date.today().year
         
-        # Get current balance
-        balance = self.db.query(LeaveBalance).filter(
-            and_(
+        # Only the remaining days are needed, so no LeaveBalance object is built
+        remaining_balance = self.db.scalar(
+            select(LeaveBalance.remaining_balance).where(
                 LeaveBalance.employee_id == employee_id,
                 LeaveBalance.leave_type_id == leave_type_id,
                 LeaveBalance.year == current_year
             )
-        ).first()
+        )
         
-        if not balance:
+        if remaining_balance is None:
             return False, "No leave balance found for this leave type"
         
-        # Calculate requested days
-        requested_days = (end_date - start_date).days + 1
-        
-        if balance.remaining_balance < requested_days:
-            return False, f"Insufficient leave balance. Available: {balance.remaining_balance} days, Requested: {requested_days} days"
+        if remaining_balance < requested_days:
+            return False, f"Insufficient leave balance. Available: {remaining_balance} days, Requested: {requested_days} days"
         
         return True, "Sufficient leave balance available"
     
-    def _check_leave_type_rules(self, leave_type_id: int, start_date: date, end_date: date) -> Tuple[bool, str]:
+    def _check_leave_type_rules(self, leave_type_id: int, requested_days: int) -> Tuple[bool, str]:
         """Check leave type specific rules"""
-        leave_type = self.db.query(LeaveType).filter(LeaveType.id == leave_type_id).first()
+        leave_type = get_leave_type(self.db, leave_type_id)
         
         if not leave_type or not leave_type.is_active:
             return False, "Invalid or inactive leave type"
         
-        requested_days = (end_date - start_date).days + 1
-        
         # Check max consecutive days
         if leave_type.max_consecutive_days and requested_days > leave_type.max_consecutive_days:
             return False, f"Request exceeds maximum consecutive days allowed ({leave_type.max_consecutive_days} days)"
@@ -118,23 +348,29 @@ class LeaveValidationService:
         return True, "Leave type rules satisfied"
 
 class LeaveRequestService:
-    """Service for managing leave requests"""
+    """Service for managing leave requests.
+
+    With `background_tasks`, notification emails are sent after the response
+    instead of inside the request.
+    """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, background_tasks: Optional[BackgroundTasks] = None):
         self.db = db
-        self.validation_service = LeaveValidationService(db)
+        self.background_tasks = background_tasks
+
+    @cached_property
+    def validation_service(self) -> LeaveValidationService:
+        # Only request creation validates, so read-only callers skip building it
+        return LeaveValidationService(self.db)
     
     def create_leave_request(self, employee_id: int, leave_request: LeaveRequestCreate) -> Tuple[bool, str, Optional[LeaveRequest]]:
         """Create a new leave request"""
         
-        # Validate the request
-        is_valid, message = self.validation_service.validate_leave_request(employee_id, leave_request)
+        # Validate the request; the day count comes back with the result
+        is_valid, message, total_days = self.validation_service.check_leave_request(employee_id, leave_request)
         if not is_valid:
             return False, message, None
         
-        # Calculate total days
-        total_days = (leave_request.end_date - leave_request.start_date).days + 1
-        
         # Create the request
         db_request = LeaveRequest(
             employee_id=employee_id,
@@ -149,103 +385,207 @@ class LeaveRequestService:
         
         self.db.add(db_request)
         self.db.commit()
-        self.db.refresh(db_request)
+        db_request = self._load_for_notification(db_request.id)
+        invalidate_policy_summary(employee_id)
         
         # Send notification to manager
         self._send_leave_request_notification(db_request)
         
         return True, "Leave request created successfully", db_request
     
-    def get_employee_leave_requests(self, employee_id: int, year: Optional[int] = None) -> List[LeaveRequest]:
-        """Get all leave requests for an employee"""
-        query = self.db.query(LeaveRequest).filter(LeaveRequest.employee_id == employee_id)
+    def get_employee_leave_requests(
+        self, employee_id: int, year: Optional[int] = None, limit: Optional[int] = None, cursor: Optional[int] = None
+    ) -> List[Row]:
+        """Get leave requests for an employee as list-item rows, newest first"""
+        stmt = LEAVE_REQUEST_LIST_ITEM_SELECT.where(LeaveRequest.employee_id == employee_id)
 
         if year:
             # Use date range filtering for cross-DB compatibility (SQLite/Postgres)
-            year_start = date(year, 1, 1)
-            year_end = date(year, 12, 31)
+            year_start, year_end = year_range(year)
             # Include any request that overlaps the year range
-            query = query.filter(
-                and_(
-                    LeaveRequest.start_date <= year_end,
-                    LeaveRequest.end_date >= year_start
-                )
+            stmt = stmt.where(
+                LeaveRequest.start_date <= year_end,
+                LeaveRequest.end_date >= year_start
             )
 
-        return query.order_by(LeaveRequest.created_at.desc()).all()
+        return self.db.execute(_keyset_page(stmt, limit, cursor)).all()
     
-    def get_pending_requests_for_manager(self, manager_id: int) -> List[LeaveRequest]:
-        """Get all pending requests that need approval from a specific manager"""
-        
-        # Get all subordinates
-        subordinates = self.db.query(Employee).filter(Employee.manager_id == manager_id).all()
-        subordinate_ids = [emp.id for emp in subordinates]
-        
-        if not subordinate_ids:
-            return []
-        
-        # Get pending requests from subordinates
-        return self.db.query(LeaveRequest).filter(
-            and_(
-                LeaveRequest.employee_id.in_(subordinate_ids),
-                LeaveRequest.status == LeaveStatus.PENDING
+    def get_status_counts(self, employee_id: int, year: int) -> Dict[LeaveStatus, int]:
+        """Count an employee's leave requests overlapping a year, grouped by status"""
+        year_start, year_end = year_range(year)
+        rows = self.db.execute(
+            select(LeaveRequest.status, func.count(LeaveRequest.id)).where(
+                LeaveRequest.employee_id == employee_id,
+                LeaveRequest.start_date <= year_end,
+                LeaveRequest.end_date >= year_start
+            ).group_by(LeaveRequest.status)
+        ).all()
+        return dict(rows)
+    
+    def get_pending_requests_for_manager(
+        self, manager_id: int, limit: Optional[int] = None, cursor: Optional[int] = None
+    ) -> List[Row]:
+        """Get pending requests that need approval from a specific manager as list-item rows, newest first"""
+        # The list-item select already joins Employee, so subordinates are filtered in the same statement
+        return self.db.execute(
+            _keyset_page(
+                LEAVE_REQUEST_LIST_ITEM_SELECT.where(
+                    Employee.manager_id == manager_id,
+                    LeaveRequest.status == LeaveStatus.PENDING
+                ),
+                limit,
+                cursor
             )
-        ).order_by(LeaveRequest.created_at.desc()).all()
+        ).all()
     
-    def approve_leave_request(self, request_id: int, approver_id: int, approval_data: LeaveApprovalRequest) -> Tuple[bool, str]:
-        """Approve or reject a leave request"""
-        
-        # Get the request
-        leave_request = self.db.query(LeaveRequest).filter(LeaveRequest.id == request_id).first()
-        if not leave_request:
-            return False, "Leave request not found"
-        
-        if leave_request.status != LeaveStatus.PENDING:
-            return False, "Leave request is not pending"
-        
+    @staticmethod
+    def _decision_status(approval_data: LeaveApprovalRequest) -> Tuple[Optional[LeaveStatus], str]:
+        """Map an approval payload to approved/rejected, or return None with the reason it is invalid"""
         # Normalize incoming status (Pydantic enum) to model enum
         try:
             incoming_status_value = approval_data.status.value if hasattr(approval_data.status, 'value') else str(approval_data.status)
             new_status = LeaveStatus(incoming_status_value)
         except Exception:
-            return False, "Invalid status provided"
+            return None, "Invalid status provided"
 
         # Only approved/rejected are valid transitions here
         if new_status == LeaveStatus.PENDING:
-            return False, "Invalid status for approval. Use approved or rejected."
+            return None, "Invalid status for approval. Use approved or rejected."
         if new_status == LeaveStatus.CANCELLED:
-            return False, "Invalid status for approval. Cannot cancel via approval endpoint."
+            return None, "Invalid status for approval. Cannot cancel via approval endpoint."
+        return new_status, ""
+    
+    def approve_leave_request(self, request_id: int, approver_id: int, approval_data: LeaveApprovalRequest) -> Tuple[bool, str]:
+        """Approve or reject a leave request"""
+        new_status, error = self._decision_status(approval_data)
+        if new_status is None:
+            return False, error
 
-        # Update the request
-        leave_request.status = new_status
-        leave_request.approved_by = approver_id
-        leave_request.approved_at = datetime.utcnow()
-        
+        # Update the request, provided nobody else has decided it in the meantime
+        values = {"status": new_status, "approved_by": approver_id, "approved_at": datetime.utcnow()}
         if new_status == LeaveStatus.REJECTED:
-            leave_request.rejection_reason = approval_data.comments
+            values["rejection_reason"] = approval_data.comments
+        
+        leave_request = self.update_if_pending(request_id, **values)
+        if leave_request is None:
+            self.db.rollback()
+            if self.db.scalar(select(LeaveRequest.id).where(LeaveRequest.id == request_id)) is None:
+                return False, "Leave request not found"
+            return False, "Leave request is not pending"
         
         # If approved, update leave balance
         if new_status == LeaveStatus.APPROVED:
             self._update_leave_balance(leave_request)
         
         self.db.commit()
+        invalidate_policy_summary(leave_request.employee_id)
         
         # Send notification to employee
-        self._send_leave_approval_notification(leave_request)
+        self._send_leave_approval_notification(self._load_for_notification(request_id))
         
         return True, f"Leave request {new_status.value} successfully"
     
+    def approve_many(self, request_ids: List[int], approver_id: int, approval_data: LeaveApprovalRequest) -> Tuple[bool, str, List[int]]:
+        """Approve or reject several pending requests with one UPDATE and one commit.
+
+        Requests that do not exist or are no longer pending are skipped. Returns
+        the ids that were decided.
+        """
+        new_status, error = self._decision_status(approval_data)
+        if new_status is None:
+            return False, error, []
+        
+        values = {"status": new_status, "approved_by": approver_id, "approved_at": datetime.utcnow()}
+        if new_status == LeaveStatus.REJECTED:
+            values["rejection_reason"] = approval_data.comments
+        
+        pending = (LeaveRequest.id.in_(set(request_ids)), LeaveRequest.status == LeaveStatus.PENDING)
+        if self.db.get_bind().dialect.update_returning:
+            decided = self.db.execute(
+                update(LeaveRequest).where(*pending).values(**values).returning(
+                    LeaveRequest.id, LeaveRequest.employee_id, LeaveRequest.leave_type_id, LeaveRequest.total_days
+                )
+            ).all()
+        else:
+            # Lock the pending rows so the UPDATE decides exactly the rows read here
+            decided = self.db.execute(
+                select(
+                    LeaveRequest.id, LeaveRequest.employee_id, LeaveRequest.leave_type_id, LeaveRequest.total_days
+                ).where(*pending).with_for_update()
+            ).all()
+            if decided:
+                self.db.execute(
+                    update(LeaveRequest).where(LeaveRequest.id.in_([row.id for row in decided])).values(**values)
+                )
+        
+        if not decided:
+            self.db.rollback()
+            return False, "No pending leave requests found", []
+        
+        if new_status == LeaveStatus.APPROVED:
+            # One executemany UPDATE for all affected balances, days summed per balance
+            used: Dict[Tuple[int, int], int] = {}
+            for row in decided:
+                key = (row.employee_id, row.leave_type_id)
+                used[key] = used.get(key, 0) + row.total_days
+            balances = LeaveBalance.__table__
+            self.db.execute(
+                update(balances).where(
+                    balances.c.employee_id == bindparam("b_employee_id"),
+                    balances.c.leave_type_id == bindparam("b_leave_type_id"),
+                    balances.c.year == date.today().year
+                ).values(
+                    total_used=balances.c.total_used + bindparam("b_days"),
+                    # Same formula as _update_leave_balance, so both paths correct any drift alike
+                    remaining_balance=balances.c.total_allocated + balances.c.total_carried_forward
+                    - (balances.c.total_used + bindparam("b_days"))
+                ),
+                [
+                    {"b_employee_id": employee_id, "b_leave_type_id": leave_type_id, "b_days": days}
+                    for (employee_id, leave_type_id), days in used.items()
+                ]
+            )
+        
+        self.db.commit()
+        for employee_id in {row.employee_id for row in decided}:
+            invalidate_policy_summary(employee_id)
+        
+        decided_ids = [row.id for row in decided]
+        for leave_request in self.db.scalars(
+            select(LeaveRequest).options(*LEAVE_REQUEST_NOTIFICATION_OPTIONS).where(LeaveRequest.id.in_(decided_ids))
+        ).unique():
+            self._send_leave_approval_notification(leave_request)
+        
+        return True, f"{len(decided_ids)} leave request(s) {new_status.value} successfully", decided_ids
+    
+    def update_if_pending(self, request_id: int, **values) -> Optional[LeaveRequest]:
+        """Apply `values` to a request only while it is still pending.
+
+        The status check is part of the UPDATE itself, so two concurrent
+        transitions cannot both succeed. Returns the updated request, or None
+        if it does not exist or is no longer pending.
+        """
+        stmt = update(LeaveRequest).where(
+            LeaveRequest.id == request_id,
+            LeaveRequest.status == LeaveStatus.PENDING
+        ).values(**values)
+        if self.db.get_bind().dialect.update_returning:
+            return self.db.scalars(stmt.returning(LeaveRequest)).one_or_none()
+        if self.db.execute(stmt).rowcount:
+            return self.db.get(LeaveRequest, request_id)
+        return None
+    
     def _update_leave_balance(self, leave_request: LeaveRequest):
         """Update leave balance when a request is approved"""
-        current_year = datetime.now().year
+        current_year = date.today().year
         
-        balance = self.db.query(LeaveBalance).filter(
-            and_(
+        balance = self.db.scalar(
+            select(LeaveBalance).where(
                 LeaveBalance.employee_id == leave_request.employee_id,
                 LeaveBalance.leave_type_id == leave_request.leave_type_id,
                 LeaveBalance.year == current_year
             )
-        ).first()
+        )
         
         if balance:
             balance.total_used += leave_request.total_days
@@ -255,22 +595,35 @@ class LeaveRequestService:
         else:
             logger.warning(f"No balance found for employee {leave_request.employee_id}, leave type {leave_request.leave_type_id}, year {current_year}")
     
+    def _load_for_notification(self, request_id: int) -> LeaveRequest:
+        """Reload a just-committed request with the relationships the emails need"""
+        return self.db.get(LeaveRequest, request_id, options=LEAVE_REQUEST_NOTIFICATION_OPTIONS, populate_existing=True)
+    
+    def _dispatch(self, send: Callable, *args):
+        """Run an email send now, or queue it to run after the response"""
+        if self.background_tasks is not None:
+            # The request was loaded with everything the email reads, so the
+            # task never touches the session after it is closed
+            self.background_tasks.add_task(send, *args)
+        else:
+            send(*args)
+    
     def _send_leave_request_notification(self, leave_request):
         """Send notification to manager about new leave request"""
         try:
             # Get the manager
-            manager = self.db.query(Employee).filter(Employee.id == leave_request.employee.manager_id).first()
+            manager = leave_request.employee.manager
             if manager:
-                email_service.send_leave_request_notification(leave_request, manager)
+                self._dispatch(email_service.send_leave_request_notification, leave_request, manager)
         except Exception as e:
             logger.error(f"Error sending leave request notification: {str(e)}")
     
     def _send_leave_approval_notification(self, leave_request):
         """Send notification to employee about leave approval/rejection"""
         try:
-            approver = self.db.query(Employee).filter(Employee.id == leave_request.approved_by).first()
+            approver = leave_request.approver
             if approver:
-                email_service.send_leave_approval_notification(leave_request, approver)
+                self._dispatch(email_service.send_leave_approval_notification, leave_request, approver)
         except Exception as e:
             logger.error(f"Error sending leave approval notification: {str(e)}")
 
@@ -283,10 +636,10 @@ class LeaveBalanceService:
     def get_employee_leave_balances(self, employee_id: int, year: Optional[int] = None) -> List[LeaveBalance]:
         """Get leave balances for an employee"""
         if not year:
-            year = datetime.now().year
+            year = date.today().year
         
-        return self.db.query(LeaveBalance).filter(
-            and_(
+        return self.db.scalars(
+            select(LeaveBalance).options(*LEAVE_BALANCE_LIST_OPTIONS).where(
                 LeaveBalance.employee_id == employee_id,
                 LeaveBalance.year == year
             )
@@ -296,90 +649,126 @@ class LeaveBalanceService:
         """Initialize leave balances for a new employee or new year"""
         
         # Get all active leave types
-        leave_types = self.db.query(LeaveType).filter(LeaveType.is_active == True).all()
-        
-        balances = []
-        for leave_type in leave_types:
-            # Check if balance already exists
-            existing_balance = self.db.query(LeaveBalance).filter(
-                and_(
-                    LeaveBalance.employee_id == employee_id,
-                    LeaveBalance.leave_type_id == leave_type.id,
-                    LeaveBalance.year == year
-                )
-            ).first()
-            
-            if not existing_balance:
-                # Create new balance
-                balance = LeaveBalance(
-                    employee_id=employee_id,
-                    leave_type_id=leave_type.id,
-                    year=year,
-                    total_allocated=leave_type.max_days_per_year or 0,
-                    total_used=0,
-                    total_carried_forward=0,
-                    remaining_balance=leave_type.max_days_per_year or 0
-                )
-                self.db.add(balance)
-                balances.append(balance)
+        leave_types = self.db.scalars(select(LeaveType).where(LeaveType.is_active == True)).all()
+        
+        # Leave types that already have a balance for this year are skipped
+        existing_type_ids = set(self.db.scalars(
+            select(LeaveBalance.leave_type_id).where(
+                LeaveBalance.employee_id == employee_id,
+                LeaveBalance.year == year
+            )
+        ).all())
+        
+        rows = [
+            {
+                "employee_id": employee_id,
+                "leave_type_id": leave_type.id,
+                "year": year,
+                "total_allocated": leave_type.max_days_per_year or 0,
+                "total_used": 0,
+                "total_carried_forward": 0,
+                "remaining_balance": leave_type.max_days_per_year or 0,
+            }
+            for leave_type in leave_types
+            if leave_type.id not in existing_type_ids
+        ]
+        if not rows:
+            return []
+        
+        # executemany in bounded batches keeps each statement under the server packet limit
+        for i in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            self.db.execute(insert(LeaveBalance), rows[i:i + BULK_INSERT_BATCH_SIZE])
+        self.db.commit()
+        invalidate_policy_summary(employee_id)
         
+        return self.db.scalars(
+            select(LeaveBalance)
+            .options(*LEAVE_BALANCE_LIST_OPTIONS)
+            .where(
+                LeaveBalance.employee_id == employee_id,
+                LeaveBalance.year == year,
+                LeaveBalance.leave_type_id.in_([row["leave_type_id"] for row in rows])
+            )
+        ).all()
+    
+    def bulk_initialize(self, year: int) -> int:
+        """Create missing balances for every active employee and leave type in one INSERT ... SELECT"""
+        allocated = func.coalesce(LeaveType.max_days_per_year, 0)
+        missing = select(
+            Employee.id,
+            LeaveType.id,
+            literal(year),
+            allocated,
+            literal(0),
+            literal(0),
+            allocated
+        ).join(LeaveType, true()).where(
+            Employee.is_active == True,
+            LeaveType.is_active == True,
+            ~exists().where(
+                LeaveBalance.employee_id == Employee.id,
+                LeaveBalance.leave_type_id == LeaveType.id,
+                LeaveBalance.year == year
+            )
+        ).order_by(Employee.id, LeaveType.id)
+        result = self.db.execute(
+            insert(LeaveBalance).from_select(
+                [
+                    LeaveBalance.employee_id, LeaveBalance.leave_type_id, LeaveBalance.year,
+                    LeaveBalance.total_allocated, LeaveBalance.total_used,
+                    LeaveBalance.total_carried_forward, LeaveBalance.remaining_balance
+                ],
+                missing
+            )
+        )
         self.db.commit()
-        return balances
+        invalidate_policy_summary()
+        return result.rowcount
     
     def process_carry_forward(self, year: int) -> int:
         """Process carry forward for all employees for a given year"""
         
-        processed_count = 0
-        
-        # Get all employees
-        employees = self.db.query(Employee).filter(Employee.is_active == True).all()
+        # Previous year balances of active employees on carry-forward leave types, in one query
+        prev_year_balances = self.db.execute(
+            select(
+                LeaveBalance.employee_id,
+                LeaveBalance.leave_type_id,
+                LeaveBalance.remaining_balance,
+                LeaveType.max_days_per_year,
+                LeaveType.max_carry_forward_days
+            )
+            .join(LeaveType, LeaveBalance.leave_type_id == LeaveType.id)
+            .join(Employee, LeaveBalance.employee_id == Employee.id)
+            .where(
+                Employee.is_active == True,
+                LeaveType.carry_forward_enabled == True,
+                LeaveBalance.year == year - 1
+            )
+        ).all()
         
-        for employee in employees:
-            # Get previous year balances
-            prev_year_balances = self.db.query(LeaveBalance).filter(
-                and_(
-                    LeaveBalance.employee_id == employee.id,
-                    LeaveBalance.year == year - 1
-                )
-            ).all()
-            
-            for prev_balance in prev_year_balances:
-                # Get leave type to check carry forward rules
-                leave_type = self.db.query(LeaveType).filter(LeaveType.id == prev_balance.leave_type_id).first()
-                
-                if leave_type and leave_type.carry_forward_enabled:
-                    # Calculate carry forward amount
-                    carry_forward_amount = min(
-                        prev_balance.remaining_balance,
-                        leave_type.max_carry_forward_days or prev_balance.remaining_balance
-                    )
-                    
-                    if carry_forward_amount > 0:
-                        # Get or create current year balance
-                        current_balance = self.db.query(LeaveBalance).filter(
-                            and_(
-                                LeaveBalance.employee_id == employee.id,
-                                LeaveBalance.leave_type_id == leave_type.id,
-                                LeaveBalance.year == year
-                            )
-                        ).first()
-                        
-                        if not current_balance:
-                            current_balance = LeaveBalance(
-                                employee_id=employee.id,
-                                leave_type_id=leave_type.id,
-                                year=year,
-                                total_allocated=leave_type.max_days_per_year or 0,
-                                total_used=0,
-                                total_carried_forward=carry_forward_amount,
-                                remaining_balance=(leave_type.max_days_per_year or 0) + carry_forward_amount
-                            )
-                            self.db.add(current_balance)
-                        else:
-                            current_balance.total_carried_forward = carry_forward_amount
-                            current_balance.remaining_balance = current_balance.total_allocated + carry_forward_amount - current_balance.total_used
-                        
-                        processed_count += 1
+        rows = []
+        for prev in prev_year_balances:
+            carry_forward_amount = min(prev.remaining_balance, prev.max_carry_forward_days or prev.remaining_balance)
+            if carry_forward_amount > 0:
+                allocated = prev.max_days_per_year or 0
+                rows.append({
+                    "employee_id": prev.employee_id,
+                    "leave_type_id": prev.leave_type_id,
+                    "year": year,
+                    "total_allocated": allocated,
+                    "total_used": 0,
+                    "total_carried_forward": carry_forward_amount,
+                    "remaining_balance": allocated + carry_forward_amount
+                })
+        
+        # Existing balances for the year keep their allocation and usage
+        balances = LeaveBalance.__table__.c
+        upsert_leave_balances(self.db, rows, lambda new: {
+            "total_carried_forward": new.total_carried_forward,
+            "remaining_balance": balances.total_allocated + new.total_carried_forward - balances.total_used,
+            "updated_at": func.now()
+        })
         
         self.db.commit()
-        return processed_count
+        invalidate_policy_summary()
+        return len(rows)
@@ -3,6 +3,7 @@
 Simple server to test the leave management system
 """
 
+import json
 import os
 import sys
 from datetime import datetime, date, timedelta
@@ -15,18 +16,20 @@ sys.path.insert(0, project_root)
 os.environ['TZ'] = 'Europe/Dublin'
 
 try:
-    from fastapi import FastAPI, status
+    from fastapi import FastAPI, Response, status
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.responses import JSONResponse
+    from fastapi.openapi.docs import get_swagger_ui_html
     from fastapi.openapi.utils import get_openapi
     
     app = FastAPI(
         title="Leave Management API",
         version="1.0.0",
         description="API for Employee Leave Management System",
-        docs_url="/docs",
+        # The schema and docs routes are registered below so the schema can be served pre-encoded
+        docs_url=None,
         redoc_url=None,
-        openapi_url="/openapi.json",
+        openapi_url=None,
     )
 
     @app.get("/api/health-check", include_in_schema=False)
@@ -63,12 +66,31 @@ try:
 
     app.openapi = custom_openapi
 
+    # Every route is registered by now, so build and encode the schema once at import
+    OPENAPI_JSON = json.dumps(app.openapi(), separators=(",", ":")).encode()
+
+    @app.get("/openapi.json", include_in_schema=False)
+    def openapi_json():
+        return Response(content=OPENAPI_JSON, media_type="application/json")
+
+    @app.get("/docs", include_in_schema=False)
+    def swagger_ui():
+        return get_swagger_ui_html(openapi_url="/openapi.json", title=f"{app.title} - Swagger UI")
+
     if __name__ == "__main__":
         import uvicorn
         print("Starting Leave Management System...")
         print("API Documentation will be available at: http://localhost:8000/docs")
         print("Health check endpoint: http://localhost:8000/api/health-check")
-        uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+        # Auto-reload is for development only; it runs a single worker process
+        development = os.getenv("ENV", "development") == "development"
+        uvicorn.run(
+            "simple_server:app",
+            host="0.0.0.0",
+            port=8000,
+            reload=development,
+            workers=None if development else os.cpu_count(),
+        )
 
 except ImportError as e:
     print(f"Error importing required modules: {e}")
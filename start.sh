@@ -43,7 +43,7 @@ fi
 # Initialize database if init script exists
 if [ -f "app/db/init_leave_data.py" ]; then
     echo "Initializing database with sample data..."
-    python3 app/db/init_leave_data.py
+    python3 -m app.db.init_leave_data
 fi
 
 # Start the application